@@ -1,104 +1,105 @@
 """配置管理"""
 
+import functools
 import os
-from dataclasses import dataclass, field
-from typing import Any, Dict
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Tuple
 
 from .constants import API_CONSTANTS, CACHE_CONSTANTS, DEFAULT_LIMITS
 
+# 环境变量配置项: (字段名, 环境变量名, 类型转换, 默认值)
+_ENV_FIELDS: Tuple[Tuple[str, str, Callable[[str], Any], Any], ...] = (
+    ("base_url", "RECIPE_BASE_URL", str, API_CONSTANTS["BASE_URL"]),
+    ("site_url", "RECIPE_SITE_URL", str, API_CONSTANTS["SITE_URL"]),
+    ("request_timeout", "RECIPE_TIMEOUT", float, API_CONSTANTS["REQUEST_TIMEOUT"]),
+    ("max_retries", "RECIPE_MAX_RETRIES", int, API_CONSTANTS["MAX_RETRIES"]),
+    ("retry_delay", "RECIPE_RETRY_DELAY", float, API_CONSTANTS["RETRY_DELAY"]),
+    ("cache_ttl", "RECIPE_CACHE_TTL", int, CACHE_CONSTANTS["DEFAULT_TTL"]),
+    ("search_cache_size", "RECIPE_SEARCH_CACHE_SIZE", int, CACHE_CONSTANTS["SEARCH_CACHE_SIZE"]),
+    ("random_pool_size", "RECIPE_RANDOM_POOL_SIZE", int, CACHE_CONSTANTS["RANDOM_POOL_SIZE"]),
+    ("max_search_results", "RECIPE_MAX_SEARCH_RESULTS", int, DEFAULT_LIMITS["MAX_SEARCH_RESULTS"]),
+    ("max_random_results", "RECIPE_MAX_RANDOM_RESULTS", int, DEFAULT_LIMITS["MAX_RANDOM_RESULTS"]),
+    (
+        "max_category_display",
+        "RECIPE_MAX_CATEGORY_DISPLAY",
+        int,
+        DEFAULT_LIMITS["MAX_CATEGORY_DISPLAY"],
+    ),
+)
 
-@dataclass
+
+@functools.lru_cache(maxsize=1)
+def _load_env_config() -> Dict[str, Any]:
+    """读取并解析环境变量配置，成功后进程内只执行一次
+
+    在首次创建 RecipeConfig 时才调用，非法取值引发的 ValueError 由初始化流程捕获并提示，
+    不会导致插件导入失败。
+    """
+    env_config = {}
+    for name, env_key, convert, default in _ENV_FIELDS:
+        raw = os.environ.get(env_key)
+        env_config[name] = default if raw is None else convert(raw)
+    return env_config
+
+
+def _env_default(name: str) -> Any:
+    """声明默认值在实例化时从环境变量快照读取的字段"""
+    return field(default_factory=lambda: _load_env_config()[name])
+
+
+@dataclass(frozen=True, slots=True)
 class RecipeConfig:
-    """食谱插件配置类"""
+    """食谱插件配置类
+
+    默认值来自首次实例化时缓存的环境变量快照，slots=True 省去实例 __dict__
+    """
 
     # API配置
-    base_url: str = field(
-        default_factory=lambda: os.getenv("RECIPE_BASE_URL", API_CONSTANTS["BASE_URL"])
-    )
-    site_url: str = field(
-        default_factory=lambda: os.getenv("RECIPE_SITE_URL", API_CONSTANTS["SITE_URL"])
-    )
-    request_timeout: float = field(
-        default_factory=lambda: float(
-            os.getenv("RECIPE_TIMEOUT", str(API_CONSTANTS["REQUEST_TIMEOUT"]))
-        )
-    )
-    max_retries: int = field(
-        default_factory=lambda: int(
-            os.getenv("RECIPE_MAX_RETRIES", str(API_CONSTANTS["MAX_RETRIES"]))
-        )
-    )
-    retry_delay: float = field(
-        default_factory=lambda: float(
-            os.getenv("RECIPE_RETRY_DELAY", str(API_CONSTANTS["RETRY_DELAY"]))
-        )
-    )
+    base_url: str = _env_default("base_url")
+    site_url: str = _env_default("site_url")
+    request_timeout: float = _env_default("request_timeout")
+    max_retries: int = _env_default("max_retries")
+    retry_delay: float = _env_default("retry_delay")
 
     # 缓存配置
-    cache_ttl: int = field(
-        default_factory=lambda: int(
-            os.getenv("RECIPE_CACHE_TTL", str(CACHE_CONSTANTS["DEFAULT_TTL"]))
-        )
-    )
-    search_cache_size: int = field(
-        default_factory=lambda: int(
-            os.getenv("RECIPE_SEARCH_CACHE_SIZE", str(CACHE_CONSTANTS["SEARCH_CACHE_SIZE"]))
-        )
-    )
-    random_pool_size: int = field(
-        default_factory=lambda: int(
-            os.getenv("RECIPE_RANDOM_POOL_SIZE", str(CACHE_CONSTANTS["RANDOM_POOL_SIZE"]))
-        )
-    )
+    cache_ttl: int = _env_default("cache_ttl")
+    search_cache_size: int = _env_default("search_cache_size")
+    random_pool_size: int = _env_default("random_pool_size")
 
     # 限制配置
-    max_search_results: int = field(
-        default_factory=lambda: int(
-            os.getenv("RECIPE_MAX_SEARCH_RESULTS", str(DEFAULT_LIMITS["MAX_SEARCH_RESULTS"]))
-        )
-    )
-    max_random_results: int = field(
-        default_factory=lambda: int(
-            os.getenv("RECIPE_MAX_RANDOM_RESULTS", str(DEFAULT_LIMITS["MAX_RANDOM_RESULTS"]))
-        )
-    )
-    max_category_display: int = field(
-        default_factory=lambda: int(
-            os.getenv("RECIPE_MAX_CATEGORY_DISPLAY", str(DEFAULT_LIMITS["MAX_CATEGORY_DISPLAY"]))
-        )
-    )
+    max_search_results: int = _env_default("max_search_results")
+    max_random_results: int = _env_default("max_random_results")
+    max_category_display: int = _env_default("max_category_display")
     min_random_count: int = DEFAULT_LIMITS["MIN_RANDOM_COUNT"]
     max_random_count: int = DEFAULT_LIMITS["MAX_RANDOM_COUNT"]
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
-        return {
-            "base_url": self.base_url,
-            "site_url": self.site_url,
-            "request_timeout": self.request_timeout,
-            "max_retries": self.max_retries,
-            "retry_delay": self.retry_delay,
-            "cache_ttl": self.cache_ttl,
-            "search_cache_size": self.search_cache_size,
-            "random_pool_size": self.random_pool_size,
-            "max_search_results": self.max_search_results,
-            "max_random_results": self.max_random_results,
-            "max_category_display": self.max_category_display,
-            "min_random_count": self.min_random_count,
-            "max_random_count": self.max_random_count,
-        }
+        return {name: getattr(self, name) for name in _CONFIG_FIELD_NAMES}
 
     def validate(self) -> None:
-        """验证配置有效性"""
-        if self.request_timeout <= 0:
-            raise ValueError("request_timeout must be positive")
-        if self.max_retries < 0:
-            raise ValueError("max_retries must be non-negative")
-        if self.retry_delay < 0:
-            raise ValueError("retry_delay must be non-negative")
-        if self.cache_ttl <= 0:
-            raise ValueError("cache_ttl must be positive")
-        if self.max_search_results <= 0:
-            raise ValueError("max_search_results must be positive")
-        if self.min_random_count > self.max_random_count:
-            raise ValueError("min_random_count cannot be greater than max_random_count")
+        """验证配置有效性（相同配置只校验一次）"""
+        _validate_config(self)
+
+
+# 字段名在类定义后计算一次，to_dict 随字段定义自动同步
+_CONFIG_FIELD_NAMES: Tuple[str, ...] = tuple(f.name for f in fields(RecipeConfig))
+
+# 配置校验规则: (字段名, 校验函数, 错误信息)
+_VALIDATION_RULES: Tuple[Tuple[str, Callable[[Any], bool], str], ...] = (
+    ("request_timeout", lambda v: v > 0, "request_timeout must be positive"),
+    ("max_retries", lambda v: v >= 0, "max_retries must be non-negative"),
+    ("retry_delay", lambda v: v >= 0, "retry_delay must be non-negative"),
+    ("cache_ttl", lambda v: v > 0, "cache_ttl must be positive"),
+    ("max_search_results", lambda v: v > 0, "max_search_results must be positive"),
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _validate_config(config: RecipeConfig) -> None:
+    """按规则表校验配置，校验通过的配置会被缓存"""
+    for name, check, message in _VALIDATION_RULES:
+        if not check(getattr(config, name)):
+            raise ValueError(message)
+    if config.min_random_count > config.max_random_count:
+        raise ValueError("min_random_count cannot be greater than max_random_count")
@@ -1,80 +1,124 @@
 """远程食谱数据源实现"""
 
 import asyncio
-import urllib.parse
-from typing import Any, Dict, List, Optional
+import importlib.util
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote  # asyncio 等标准库已加载 urllib.parse，模块级导入没有额外开销
 
 import httpx
 
 from astrbot.api import logger
 
+from ..config.constants import RECIPE_CATEGORIES
 from ..config.settings import RecipeConfig
 from .source import DataParseError, DataValidationError, NetworkError, RecipeDataSource
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库
+    _json_loads = json.loads
+
+# 匹配食谱路径 dishes/<分类>/<菜名>
+_LOCATION_RE = re.compile(r"dishes/([^/#]+)/([^/#]+)")
+
+# 健康检查结果缓存时间上限（秒）：成功结果缓存 min(请求超时, 30秒)，失败结果缓存更短以便尽快恢复
+_HEALTH_CACHE_MAX_TTL = 30.0
+_HEALTH_FAILURE_TTL = 5.0
+
+
+def create_http_client(config: RecipeConfig) -> httpx.AsyncClient:
+    """创建可在插件生命周期内复用的HTTP客户端
+
+    只访问单一主机，保持少量长连接；安装了 h2 时启用 HTTP/2。
+    压缩编码沿用 httpx 默认协商，已安装 brotli 时会自动声明 br。
+    """
+    return httpx.AsyncClient(
+        timeout=config.request_timeout,
+        follow_redirects=True,
+        http2=importlib.util.find_spec("h2") is not None,
+        headers={"User-Agent": "astrbot-plugin-cook/2.0"},
+        limits=httpx.Limits(
+            max_keepalive_connections=2, max_connections=4, keepalive_expiry=300
+        ),
+    )
+
 
 class RemoteRecipeSource(RecipeDataSource):
     """远程食谱数据源实现
 
-    从远程API获取食谱数据，支持重试机制和错误恢复
+    从远程API获取食谱数据，支持重试机制和错误恢复。
+    传入的共享客户端由调用方负责关闭，未传入时自行创建并在退出时关闭。
     """
 
-    def __init__(self, config: RecipeConfig):
+    def __init__(self, config: RecipeConfig, client: Optional[httpx.AsyncClient] = None):
         self.config = config
-        self._client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[httpx.AsyncClient] = client
+        self._owns_client = client is None
+        self._health_cache: Optional[Tuple[float, bool]] = None  # (过期时间, 结果)
+        self._health_ttl = min(config.request_timeout, _HEALTH_CACHE_MAX_TTL)
+        self._health_failure_ttl = min(self._health_ttl, _HEALTH_FAILURE_TTL)
+        # 预计算指数退避等待时间
+        self._backoff = [
+            self.config.retry_delay * (2**attempt) for attempt in range(self.config.max_retries)
+        ]
 
     async def __aenter__(self):
         """异步上下文管理器入口"""
-        self._client = httpx.AsyncClient(
-            timeout=self.config.request_timeout, follow_redirects=True
-        )
+        self._get_client()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """异步上下文管理器出口"""
-        if self._client:
+        if self._owns_client and self._client:
             await self._client.aclose()
             self._client = None
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取HTTP客户端，未注入时按需创建"""
+        if not self._client:
+            self._client = create_http_client(self.config)
+        return self._client
+
     async def fetch_recipes(self) -> List[Dict[str, Any]]:
         """获取食谱数据，带重试机制"""
-        last_error = None
-
-        for attempt in range(self.config.max_retries + 1):
+        # 等待时间为 None 表示最后一次尝试；等待时间为 0 时不让出事件循环
+        for attempt, wait_time in enumerate((*self._backoff, None)):
             try:
                 return await self._fetch_with_client()
             except NetworkError as e:
-                last_error = e
-                if attempt < self.config.max_retries:
-                    wait_time = self.config.retry_delay * (2**attempt)  # 指数退避
-                    logger.warning(
-                        f"第 {attempt + 1} 次获取数据失败，{wait_time}秒后重试: {e.message}"
-                    )
+                if wait_time is None:
+                    logger.error("获取数据失败，已达到最大重试次数: %s", e.message)
+                    raise
+                logger.warning(
+                    "第 %d 次获取数据失败，%s秒后重试: %s", attempt + 1, wait_time, e.message
+                )
+                if wait_time:
                     await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"获取数据失败，已达到最大重试次数: {e.message}")
             except (DataParseError, DataValidationError) as e:
                 # 数据解析错误不重试
                 logger.error(f"数据处理失败: {e.message}")
                 raise e
 
-        # 所有重试都失败了
-        raise last_error or NetworkError("未知网络错误", source="remote_api")
+        # 不可达：最后一次尝试要么返回要么抛出
+        raise NetworkError("未知网络错误", source="remote_api")
 
     async def _fetch_with_client(self) -> List[Dict[str, Any]]:
         """使用HTTP客户端获取数据"""
-        if not self._client:
-            self._client = httpx.AsyncClient(
-                timeout=self.config.request_timeout, follow_redirects=True
-            )
+        client = self._get_client()
 
         try:
             logger.info(f"正在从远程API获取数据: {self.config.base_url}")
-            response = await self._client.get(self.config.base_url)
+            response = await client.get(self.config.base_url)
             response.raise_for_status()
 
-            # 解析JSON响应
+            # 解析JSON响应（orjson.JSONDecodeError 同为 ValueError 子类）
             try:
-                data = response.json()
+                data = _json_loads(response.content)
             except ValueError as e:
                 raise DataParseError(f"JSON解析失败: {str(e)}", source="remote_api", cause=e)
 
@@ -82,7 +126,8 @@ class RemoteRecipeSource(RecipeDataSource):
             if not isinstance(data, dict):
                 raise DataValidationError("响应数据不是有效的JSON对象", source="remote_api")
 
-            docs = data.get("docs", [])
+            # 只保留 docs，其余顶层字段随 data 一起释放
+            docs = data.pop("docs", [])
             if not isinstance(docs, list):
                 raise DataValidationError("docs字段不是有效的列表", source="remote_api")
 
@@ -99,20 +144,25 @@ class RemoteRecipeSource(RecipeDataSource):
             raise NetworkError(f"请求超时: {str(e)}", source="remote_api", cause=e)
 
     async def health_check(self) -> bool:
-        """检查远程API健康状态"""
-        try:
-            if not self._client:
-                self._client = httpx.AsyncClient(
-                    timeout=min(self.config.request_timeout, 5.0),  # 健康检查用较短超时
-                    follow_redirects=True,
-                )
+        """检查远程API健康状态，短时间内复用上次结果"""
+        now = time.monotonic()
+        if self._health_cache and now < self._health_cache[0]:
+            return self._health_cache[1]
 
-            response = await self._client.head(self.config.base_url)
-            return response.status_code == 200
+        try:
+            response = await self._get_client().head(
+                self.config.base_url,
+                timeout=min(self.config.request_timeout, 5.0),  # 健康检查用较短超时
+            )
+            is_healthy = response.status_code == 200
 
         except Exception as e:
             logger.warning(f"健康检查失败: {str(e)}")
-            return False
+            is_healthy = False
+
+        ttl = self._health_ttl if is_healthy else self._health_failure_ttl
+        self._health_cache = (time.monotonic() + ttl, is_healthy)
+        return is_healthy
 
     def get_source_info(self) -> Dict[str, Any]:
         """获取数据源信息"""
@@ -134,47 +184,47 @@ class RemoteRecipeSource(RecipeDataSource):
         Returns:
             List[Dict[str, str]]: 处理后的食谱数据，包含 name, category, url 字段
         """
-        from ..config.constants import RECIPE_CATEGORIES
-
+        # 热循环中使用局部变量，避免重复的全局/属性查找
+        get_category_zh = RECIPE_CATEGORIES.get
+        match_location = _LOCATION_RE.search
         processed_recipes = []
-        seen_dishes = set()  # 去重
+        append_recipe = processed_recipes.append
+        seen_dishes = set()  # 去重，键为 (菜名, 英文分类)
 
         for item in raw_data:
             location = item.get("location", "")
-            if not location or "dishes/" not in location or "#" in location:
+            if not location or "#" in location:
                 continue
 
             # 解析URL路径
-            parts = location.split("dishes/")
-            if len(parts) < 2:
+            match = match_location(location)
+            if not match:
                 continue
 
-            path_parts = parts[1].strip("/").split("/")
-            if len(path_parts) < 2:
-                continue
+            category_en, dish_name_encoded = match.groups()
 
-            category_en = path_parts[0]
-            dish_name_encoded = path_parts[1]
+            # 先验证分类有效性，再做代价更高的URL解码
+            category_zh = get_category_zh(category_en)
+            if category_zh is None:
+                continue
 
             # URL解码菜品名称
             try:
-                dish_name = urllib.parse.unquote(dish_name_encoded)
+                dish_name = unquote(dish_name_encoded)
             except Exception:
                 continue
 
-            # 验证分类有效性
-            if category_en not in RECIPE_CATEGORIES:
+            # 解码后为空白的菜名（如 %20）无效
+            if not dish_name.strip():
                 continue
 
-            category_zh = RECIPE_CATEGORIES[category_en]
-
             # 去重处理
-            dish_key = f"{dish_name}_{category_zh}"
+            dish_key = (dish_name, category_en)
             if dish_key in seen_dishes:
                 continue
             seen_dishes.add(dish_key)
 
-            processed_recipes.append({
+            append_recipe({
                 "name": dish_name,
                 "category": category_en,
                 "category_zh": category_zh,
@@ -40,6 +40,14 @@ class RecipeDataSource(ABC):
         """
         pass
 
+    async def __aenter__(self):
+        """打开数据源持有的资源（如HTTP连接），默认无操作"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """释放数据源持有的资源，默认无操作"""
+        return None
+
 
 class DataSourceError(Exception):
     """数据源异常基类"""
@@ -1,17 +1,20 @@
 """吃点啥 - AstrBot 食谱插件 (重构版)"""
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from astrbot.api import logger
 from astrbot.api.event import AstrMessageEvent, filter
 from astrbot.api.star import Context, Star, register
 
 from .config.settings import RecipeConfig
-from .data.remote_source import RemoteRecipeSource
+from .data.remote_source import RemoteRecipeSource, create_http_client
 from .services.recipe_service import RecipeService
 from .utils.formatters import ResponseFormatter
 from .utils.validators import DataValidator, ValidationError
 
+if TYPE_CHECKING:
+    import httpx
+
 
 @register("cook", "AstrBot", "吃点啥 - 食谱推荐插件", "2.0.0")
 class CookPlugin(Star):
@@ -29,6 +32,7 @@ class CookPlugin(Star):
         self._validator: Optional[DataValidator] = None
         self._formatter: Optional[ResponseFormatter] = None
         self._config: Optional[RecipeConfig] = None
+        self._http_client: Optional["httpx.AsyncClient"] = None
 
         # 初始化状态
         self._is_ready = False
@@ -47,8 +51,9 @@ class CookPlugin(Star):
             self._validator = DataValidator(self._config)
             self._formatter = ResponseFormatter(self._config)
 
-            # 3. 初始化数据源
-            data_source = RemoteRecipeSource(self._config)
+            # 3. 初始化数据源（共享HTTP客户端，重载时复用连接）
+            self._http_client = create_http_client(self._config)
+            data_source = RemoteRecipeSource(self._config, client=self._http_client)
 
             # 4. 初始化核心服务
             self._recipe_service = RecipeService(data_source, self._config)
@@ -240,11 +245,11 @@ class CookPlugin(Star):
             if self._recipe_service:
                 await self._recipe_service.cleanup()
 
+            if self._http_client:
+                await self._http_client.aclose()
+                self._http_client = None
+
             logger.info("食谱插件已卸载")
 
         except Exception as e:
             logger.error(f"插件清理失败: {str(e)}")
-
-
-# 向后兼容：保留原有的类名引用
-Recipes = None  # 标记为已废弃，使用新的服务架构
@@ -1,59 +1,63 @@
 """食谱数据模型"""
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Any, Dict, List
 
-# 字符串池化 - 减少重复字符串的内存占用
-_string_pool: Dict[str, str] = {}
 _site_url_cache = "https://cook.aiursoft.cn/"
 
 
-def _intern_string(s: str) -> str:
-    """字符串池化，减少内存占用"""
-    if s not in _string_pool:
-        _string_pool[s] = s
-    return _string_pool[s]
-
-
-@dataclass(frozen=True, slots=True)
+@dataclass(slots=True)
 class Recipe:
     """食谱数据模型
 
-    使用frozen=True确保不可变性，slots=True优化内存使用
+    slots=True优化内存使用；实例按约定视为只读，不使用frozen以降低构造开销
     """
 
     name: str
     category: str
     category_zh: str
     url: str
+    full_url: str = field(init=False, repr=False, compare=False)  # 完整URL，构造时计算一次
+    _hash: int = field(init=False, repr=False, compare=False)
+    _as_dict: Dict[str, str] = field(init=False, repr=False, compare=False)
 
-    def __post_init__(self) -> None:
-        """数据验证"""
-        if not self.name.strip():
+    @classmethod
+    def validated(cls, name: str, category: str, category_zh: str, url: str) -> "Recipe":
+        """带数据验证的构造方法
+
+        直接调用构造函数不做校验，批量加载时由数据源保证字段非空
+        """
+        if not name.strip():
             raise ValueError("Recipe name cannot be empty")
-        if not self.category.strip():
+        if not category.strip():
             raise ValueError("Recipe category cannot be empty")
-        if not self.category_zh.strip():
+        if not category_zh.strip():
             raise ValueError("Recipe category_zh cannot be empty")
-        if not self.url.strip():
+        if not url.strip():
             raise ValueError("Recipe url cannot be empty")
+        return cls(name, category, category_zh, url)
 
-        # 字符串池化优化内存
-        object.__setattr__(self, "name", _intern_string(self.name))
-        object.__setattr__(self, "category", _intern_string(self.category))
-        object.__setattr__(self, "category_zh", _intern_string(self.category_zh))
-        object.__setattr__(self, "url", _intern_string(self.url))
-
-    @property
-    def full_url(self) -> str:
-        """获取完整URL - 缓存计算结果"""
+    def __post_init__(self) -> None:
+        """预计算派生字段"""
+        # 字符串驻留，相同内容共享同一对象并加速字典比较
+        self.name = sys.intern(self.name)
+        self.category = sys.intern(self.category)
+        self.category_zh = sys.intern(self.category_zh)
+        self.url = sys.intern(self.url)
+
+        # 预计算完整URL
         if self.url.startswith(_site_url_cache):
-            return self.url
-        return _site_url_cache + self.url.lstrip("/")
+            full_url = self.url
+        else:
+            full_url = _site_url_cache + self.url.lstrip("/")
+        self.full_url = sys.intern(full_url)
 
-    def to_dict(self) -> Dict[str, str]:
-        """转换为字典格式"""
-        return {
+        # 实例按约定不可变，哈希值只计算一次
+        self._hash = hash((self.name, self.category_zh))
+
+        # 预构建字典，to_dict 只需复制
+        self._as_dict = {
             "name": self.name,
             "category": self.category,
             "category_zh": self.category_zh,
@@ -61,12 +65,16 @@ class Recipe:
             "full_url": self.full_url,
         }
 
+    def to_dict(self) -> Dict[str, str]:
+        """转换为字典格式（返回副本，调用方可自由修改）"""
+        return dict(self._as_dict)
+
     def __hash__(self) -> int:
-        """优化哈希计算"""
-        return hash((self.name, self.category_zh))
+        """返回预计算的哈希值"""
+        return self._hash
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(slots=True)
 class SearchResult:
     """搜索结果数据模型"""
 
@@ -74,6 +82,7 @@ class SearchResult:
     total_count: int
     has_more: bool
     query: str = ""
+    _hash: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """数据验证"""
@@ -82,8 +91,8 @@ class SearchResult:
         if len(self.recipes) > self.total_count:
             raise ValueError("recipes count cannot exceed total_count")
 
-        # 字符串池化
-        object.__setattr__(self, "query", _intern_string(self.query))
+        # query 来自用户输入，不做驻留，避免每个不同的查询都常驻内存
+        self._hash = hash((self.query, self.total_count))
 
     @property
     def is_empty(self) -> bool:
@@ -106,14 +115,19 @@ class SearchResult:
             "is_empty": self.is_empty,
         }
 
+    def __hash__(self) -> int:
+        """返回预计算的哈希值"""
+        return self._hash
+
 
-@dataclass(frozen=True, slots=True)
+@dataclass(slots=True)
 class CategoryInfo:
     """分类信息数据模型"""
 
     name_zh: str
     name_en: str
     count: int
+    _hash: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """数据验证"""
@@ -124,25 +138,15 @@ class CategoryInfo:
         if self.count < 0:
             raise ValueError("Category count cannot be negative")
 
-        # 字符串池化
-        object.__setattr__(self, "name_zh", _intern_string(self.name_zh))
-        object.__setattr__(self, "name_en", _intern_string(self.name_en))
+        # 字符串驻留
+        self.name_zh = sys.intern(self.name_zh)
+        self.name_en = sys.intern(self.name_en)
+        self._hash = hash((self.name_en,))
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {"name_zh": self.name_zh, "name_en": self.name_en, "count": self.count}
 
-
-def clear_string_pool() -> int:
-    """清理字符串池，释放内存"""
-    count = len(_string_pool)
-    _string_pool.clear()
-    return count
-
-
-def get_string_pool_stats() -> Dict[str, Any]:
-    """获取字符串池统计信息"""
-    return {
-        "pool_size": len(_string_pool),
-        "memory_saved_estimate": len(_string_pool) * 50,  # 粗略估算节省的内存
-    }
+    def __hash__(self) -> int:
+        """返回预计算的哈希值"""
+        return self._hash
@@ -1,106 +1,201 @@
 """缓存服务实现"""
 
+import asyncio
+import heapq
+import math
 import time
 from collections import OrderedDict
 from threading import Lock
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from astrbot.api import logger
 
 
-class LRUCache:
-    """LRU缓存实现，支持TTL（生存时间）"""
+# 分片数量，必须为2的幂以便用位运算取模
+_SHARD_COUNT = 8
+
+# 每个分片至少容纳的条目数；容量不足时不分片，避免键分布不均导致过早淘汰
+_MIN_SHARD_SIZE = 16
+
+# 区分“键不存在”与“缓存值为None”的哨兵对象
+_MISSING = object()
+
+
+class _CacheShard:
+    """LRU缓存分片，每个分片持有独立的有序字典和锁"""
+
+    __slots__ = ("data", "expiry", "lock", "max_size", "hits", "misses")
+
+    def __init__(self, max_size: int):
+        # key -> (value, expire_time)
+        self.data: OrderedDict[str, Tuple[Any, float]] = OrderedDict()
+        # (expire_time, key) 最小堆；覆盖或删除后残留的旧记录在弹出时跳过
+        self.expiry: List[Tuple[float, str]] = []
+        self.lock = Lock()
+        self.max_size = max_size
+        # 命中统计，在持有分片锁时更新
+        self.hits = 0
+        self.misses = 0
+
+    def compact_expiry(self) -> None:
+        """按当前有效条目重建过期堆，丢弃残留的旧记录"""
+        self.expiry = [(expire_time, key) for key, (_, expire_time) in self.data.items()]
+        heapq.heapify(self.expiry)
+
 
-    def __init__(self, max_size: int = 100, default_ttl: int = 3600):
+class LRUCache:
+    """LRU缓存实现，支持TTL（生存时间）
+
+    按键的哈希值分片，每个分片独立加锁，降低并发访问时的锁竞争。
+    过期时间基于单调时钟，不受系统时间调整影响。
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100,
+        default_ttl: int = 3600,
+        on_set: Optional[Callable[[float], None]] = None,
+    ):
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self._cache: OrderedDict[str, Tuple[Any, float]] = (
-            OrderedDict()
-        )  # key -> (value, expire_time)
-        self._lock = Lock()
+        self._on_set = on_set  # 写入后以过期时间回调，用于调度后台清理
+        # 小容量缓存只用一个分片；分片时把余数分摊到前几个分片，总容量与 max_size 一致
+        max_size = max(1, max_size)
+        shard_count = _SHARD_COUNT if max_size >= _SHARD_COUNT * _MIN_SHARD_SIZE else 1
+        base_size, remainder = divmod(max_size, shard_count)
+        self._shards = [
+            _CacheShard(base_size + (1 if i < remainder else 0)) for i in range(shard_count)
+        ]
+        self._shard_mask = shard_count - 1
+
+    def _shard(self, key: str) -> _CacheShard:
+        """获取键所在的分片"""
+        return self._shards[hash(key) & self._shard_mask]
 
     def get(self, key: str) -> Optional[Any]:
         """获取缓存值"""
-        with self._lock:
-            if key not in self._cache:
+        shard = self._shard(key)
+        with shard.lock:
+            cache = shard.data
+            # 命中路径只做一次字典查找
+            try:
+                value, expire_time = cache[key]
+            except KeyError:
+                shard.misses += 1
                 return None
 
-            value, expire_time = self._cache[key]
-            current_time = time.time()
-
             # 检查是否过期
-            if current_time > expire_time:
-                del self._cache[key]
+            if time.monotonic() > expire_time:
+                del cache[key]
+                shard.misses += 1
                 return None
 
             # LRU: 移动到末尾
-            self._cache.move_to_end(key)
+            cache.move_to_end(key)
+            shard.hits += 1
             return value
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """设置缓存值"""
-        with self._lock:
-            current_time = time.time()
-            expire_time = current_time + (ttl or self.default_ttl)
+        shard = self._shard(key)
+        with shard.lock:
+            cache = shard.data
+            expire_time = time.monotonic() + (ttl or self.default_ttl)
 
             # 如果key已存在，先删除
-            if key in self._cache:
-                del self._cache[key]
+            cache.pop(key, None)
 
-            # 检查缓存大小限制
-            while len(self._cache) >= self.max_size:
-                # 删除最久未使用的项目
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
+            # 每次只新增一项，超出分片大小时淘汰最久未使用的一项即可
+            if len(cache) >= shard.max_size:
+                cache.popitem(last=False)
 
             # 添加新项目
-            self._cache[key] = (value, expire_time)
+            cache[key] = (value, expire_time)
+            heapq.heappush(shard.expiry, (expire_time, key))
+
+            # 旧记录过多时重建堆，避免长TTL下堆无限增长
+            if len(shard.expiry) > 4 * shard.max_size:
+                shard.compact_expiry()
+
+        if self._on_set is not None:
+            self._on_set(expire_time)
 
     def delete(self, key: str) -> bool:
         """删除缓存值"""
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.data.pop(key, _MISSING) is not _MISSING
 
     def clear(self) -> None:
         """清空缓存"""
-        with self._lock:
-            self._cache.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.data.clear()
+                shard.expiry.clear()
+
+    def reset_stats(self) -> None:
+        """重置命中统计"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.hits = 0
+                shard.misses = 0
 
     def clear_expired(self) -> int:
         """清理过期缓存，返回清理的数量"""
-        with self._lock:
-            current_time = time.time()
-            expired_keys = [
-                key for key, (_, expire_time) in self._cache.items() if current_time > expire_time
-            ]
-
-            for key in expired_keys:
-                del self._cache[key]
-
-            return len(expired_keys)
+        cleared = 0
+        current_time = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                # 只弹出已到期的堆顶记录，无需遍历全部条目
+                cache = shard.data
+                expiry = shard.expiry
+                while expiry and current_time > expiry[0][0]:
+                    expire_time, key = heapq.heappop(expiry)
+                    entry = cache.get(key)
+                    if entry is not None and entry[1] == expire_time:
+                        del cache[key]
+                        cleared += 1
+
+        return cleared
+
+    def next_expiry(self) -> float:
+        """最早的过期时间（可能来自已失效的旧记录），无条目时为 inf"""
+        earliest = math.inf
+        for shard in self._shards:
+            with shard.lock:
+                if shard.expiry and shard.expiry[0][0] < earliest:
+                    earliest = shard.expiry[0][0]
+        return earliest
 
     def size(self) -> int:
-        """获取当前缓存大小"""
-        with self._lock:
-            return len(self._cache)
+        """获取当前缓存大小（不加锁，结果为近似值）"""
+        return sum(len(shard.data) for shard in self._shards)
 
     def stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
-        with self._lock:
-            current_time = time.time()
-            expired_count = sum(
-                1 for _, (_, expire_time) in self._cache.items() if current_time > expire_time
-            )
+        size = 0
+        expired_count = 0
+        hits = 0
+        misses = 0
+        current_time = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                size += len(shard.data)
+                hits += shard.hits
+                misses += shard.misses
+                expired_count += sum(
+                    1 for _, (_, expire_time) in shard.data.items() if current_time > expire_time
+                )
 
-            return {
-                "size": len(self._cache),
-                "max_size": self.max_size,
-                "expired_count": expired_count,
-                "valid_count": len(self._cache) - expired_count,
-            }
+        return {
+            "size": size,
+            "max_size": sum(shard.max_size for shard in self._shards),
+            "expired_count": expired_count,
+            "valid_count": size - expired_count,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses > 0 else 0,
+        }
 
 
 class CacheService:
@@ -114,51 +209,80 @@ class CacheService:
         search_cache_size = getattr(config, "search_cache_size", 100) if config else 100
         random_pool_size = getattr(config, "random_pool_size", 50) if config else 50
 
+        # 最早的过期时间，后台清理任务据此休眠；有更早的过期时间写入时唤醒
+        self._next_expiry = math.inf
+        self._deadline_changed = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # 等待方所在的事件循环
+
         # 不同类型的缓存
-        self.search_cache = LRUCache(max_size=search_cache_size, default_ttl=default_ttl)
-        self.random_cache = LRUCache(max_size=random_pool_size, default_ttl=default_ttl)
+        self.search_cache = LRUCache(
+            max_size=search_cache_size, default_ttl=default_ttl, on_set=self._touch_deadline
+        )
+        self.random_cache = LRUCache(
+            max_size=random_pool_size, default_ttl=default_ttl, on_set=self._touch_deadline
+        )
         self.category_cache = LRUCache(
-            max_size=20, default_ttl=default_ttl * 2
+            max_size=20, default_ttl=default_ttl * 2, on_set=self._touch_deadline
         )  # 分类信息缓存时间更长
 
-        # 统计信息
-        self.stats = {
-            "search_hits": 0,
-            "search_misses": 0,
-            "random_hits": 0,
-            "random_misses": 0,
-            "category_hits": 0,
-            "category_misses": 0,
-        }
+    def _touch_deadline(self, expire_time: float) -> None:
+        """写入缓存时提前清理截止时间
 
-    def get_search_result(self, query: str) -> Optional[Any]:
-        """获取搜索结果缓存"""
-        cache_key = f"search:{query.lower()}"
-        result = self.search_cache.get(cache_key)
+        LRUCache 可在任意线程写入，而 asyncio.Event 不是线程安全的：
+        不在等待方的事件循环中时，通过 call_soon_threadsafe 唤醒。
+        """
+        if expire_time >= self._next_expiry:
+            return
+        self._next_expiry = expire_time
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # 尚无等待方，开始等待时会读取最新的截止时间
 
-        if result is not None:
-            self.stats["search_hits"] += 1
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            self._deadline_changed.set()
         else:
-            self.stats["search_misses"] += 1
+            loop.call_soon_threadsafe(self._deadline_changed.set)
+
+    async def wait_for_expiry(self) -> None:
+        """等待到最早的缓存过期时间；缓存为空时一直等待直到有新写入
+
+        只能在单个事件循环中调用，立即到期时也会让出一次事件循环。
+        """
+        self._loop = asyncio.get_running_loop()
+        while True:
+            self._deadline_changed.clear()
+            delay = self._next_expiry - time.monotonic()
+            if delay <= 0:
+                await asyncio.sleep(0)
+                return
+
+            timeout = None if self._next_expiry == math.inf else max(1.0, delay)
+            try:
+                await asyncio.wait_for(self._deadline_changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
+
+    def get_search_result(self, query: str) -> Optional[Any]:
+        """获取搜索结果缓存
 
-        return result
+        query 需由调用方规范化（去除首尾空白并转为小写），直接作为缓存键
+        """
+        return self.search_cache.get(query)
 
     def set_search_result(self, query: str, result: Any, ttl: Optional[int] = None) -> None:
-        """设置搜索结果缓存"""
-        cache_key = f"search:{query.lower()}"
-        self.search_cache.set(cache_key, result, ttl)
+        """设置搜索结果缓存，query 的要求同 get_search_result"""
+        self.search_cache.set(query, result, ttl)
 
     def get_random_recipes(self, category: str, count: int) -> Optional[Any]:
         """获取随机推荐缓存"""
         cache_key = f"random:{category}:{count}"
-        result = self.random_cache.get(cache_key)
-
-        if result is not None:
-            self.stats["random_hits"] += 1
-        else:
-            self.stats["random_misses"] += 1
-
-        return result
+        return self.random_cache.get(cache_key)
 
     def set_random_recipes(
         self, category: str, count: int, result: Any, ttl: Optional[int] = None
@@ -170,14 +294,7 @@ class CacheService:
     def get_category_info(self, category: str) -> Optional[Any]:
         """获取分类信息缓存"""
         cache_key = f"category:{category}"
-        result = self.category_cache.get(cache_key)
-
-        if result is not None:
-            self.stats["category_hits"] += 1
-        else:
-            self.stats["category_misses"] += 1
-
-        return result
+        return self.category_cache.get(cache_key)
 
     def set_category_info(self, category: str, result: Any, ttl: Optional[int] = None) -> None:
         """设置分类信息缓存"""
@@ -189,10 +306,12 @@ class CacheService:
         self.search_cache.clear()
         self.random_cache.clear()
         self.category_cache.clear()
+        self._next_expiry = math.inf
 
         # 重置统计信息
-        for key in self.stats:
-            self.stats[key] = 0
+        self.search_cache.reset_stats()
+        self.random_cache.reset_stats()
+        self.category_cache.reset_stats()
 
         logger.info("已清空所有缓存")
 
@@ -204,6 +323,13 @@ class CacheService:
 
         total_cleared = search_cleared + random_cleared + category_cleared
 
+        # 按剩余条目重新计算下一次清理时间
+        self._next_expiry = min(
+            self.search_cache.next_expiry(),
+            self.random_cache.next_expiry(),
+            self.category_cache.next_expiry(),
+        )
+
         if total_cleared > 0:
             logger.info(
                 f"清理过期缓存: 搜索{search_cleared}个, 随机{random_cleared}个, 分类{category_cleared}个"  # noqa: E501
@@ -217,39 +343,9 @@ class CacheService:
         }
 
     def get_cache_stats(self) -> Dict[str, Any]:
-        """获取缓存统计信息"""
-        search_stats = self.search_cache.stats()
-        random_stats = self.random_cache.stats()
-        category_stats = self.category_cache.stats()
-
-        # 计算命中率
-        total_search = self.stats["search_hits"] + self.stats["search_misses"]
-        total_random = self.stats["random_hits"] + self.stats["random_misses"]
-        total_category = self.stats["category_hits"] + self.stats["category_misses"]
-
-        search_hit_rate = self.stats["search_hits"] / total_search if total_search > 0 else 0
-        random_hit_rate = self.stats["random_hits"] / total_random if total_random > 0 else 0
-        category_hit_rate = (
-            self.stats["category_hits"] / total_category if total_category > 0 else 0
-        )
-
+        """获取缓存统计信息，命中统计由各缓存实例自行维护"""
         return {
-            "search_cache": {
-                **search_stats,
-                "hits": self.stats["search_hits"],
-                "misses": self.stats["search_misses"],
-                "hit_rate": round(search_hit_rate, 3),
-            },
-            "random_cache": {
-                **random_stats,
-                "hits": self.stats["random_hits"],
-                "misses": self.stats["random_misses"],
-                "hit_rate": round(random_hit_rate, 3),
-            },
-            "category_cache": {
-                **category_stats,
-                "hits": self.stats["category_hits"],
-                "misses": self.stats["category_misses"],
-                "hit_rate": round(category_hit_rate, 3),
-            },
+            "search_cache": self.search_cache.stats(),
+            "random_cache": self.random_cache.stats(),
+            "category_cache": self.category_cache.stats(),
         }
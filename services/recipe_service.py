@@ -1,15 +1,21 @@
 """核心食谱业务服务"""
 
 import asyncio
-from typing import Any, Dict, List, Optional
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
 
 from astrbot.api import logger
 
+from ..config.constants import RECIPE_CATEGORIES
 from ..config.settings import RecipeConfig
 from ..data.source import DataSourceError, RecipeDataSource
 from ..models.recipe import Recipe
 from ..services.cache_service import CacheService
 from ..services.search_service import RecipeSearchService
+from ..utils.formatters import ResponseFormatter
+
+# 后台清理出错后的退避时间（秒）
+_CLEANUP_ERROR_BACKOFF = 60.0
 
 
 class RecipeService:
@@ -29,6 +35,10 @@ class RecipeService:
         # 服务组件
         self._search_service: Optional[RecipeSearchService] = None
         self._cache_service: Optional[CacheService] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._source_opened = False  # 数据源在服务生命周期内只打开一次
+        # 格式化器只依赖配置，整个生命周期复用同一实例
+        self._formatter = ResponseFormatter(config)
 
         # 统计信息
         self._stats = {
@@ -49,6 +59,11 @@ class RecipeService:
         try:
             logger.info("开始初始化食谱服务...")
 
+            # 打开数据源，连接在重新加载之间复用，直到 cleanup 时关闭
+            if not self._source_opened:
+                await self._data_source.__aenter__()
+                self._source_opened = True
+
             # 1. 检查数据源健康状态
             is_healthy = await self._data_source.health_check()
             if not is_healthy:
@@ -64,7 +79,7 @@ class RecipeService:
             self._cache_service = CacheService(self.config)
 
             # 5. 启动后台清理任务
-            asyncio.create_task(self._background_cleanup())
+            self._cleanup_task = asyncio.create_task(self._background_cleanup())
 
             self._is_initialized = True
             logger.info(f"食谱服务初始化完成: {len(self._recipes)} 个食谱")
@@ -76,20 +91,23 @@ class RecipeService:
     async def _load_recipe_data(self) -> None:
         """加载和处理食谱数据"""
         try:
-            # 使用数据源获取原始数据
-            async with self._data_source as source:
-                raw_data = await source.fetch_recipes()
+            # 使用已打开的数据源获取原始数据
+            source = self._data_source
+            raw_data = await source.fetch_recipes()
 
-                # 处理原始数据
-                if hasattr(source, "process_raw_data"):
-                    processed_data = source.process_raw_data(raw_data)
-                else:
-                    processed_data = self._default_process_data(raw_data)
+            # 处理原始数据
+            if hasattr(source, "process_raw_data"):
+                processed_data = source.process_raw_data(raw_data)
+            else:
+                processed_data = self._default_process_data(raw_data)
 
-                # 转换为Recipe对象
-                self._recipes = self._convert_to_recipes(processed_data)
+            # 原始文档包含整页正文，提取完成后立即释放，降低构建索引时的内存占用
+            del raw_data
 
-                logger.info(f"成功加载 {len(self._recipes)} 个食谱")
+            # 转换为Recipe对象
+            self._recipes = self._convert_to_recipes(processed_data)
+
+            logger.info(f"成功加载 {len(self._recipes)} 个食谱")
 
         except DataSourceError as e:
             logger.error(f"数据源错误: {e.message}")
@@ -100,60 +118,70 @@ class RecipeService:
 
     def _default_process_data(self, raw_data: List[Dict]) -> List[Dict[str, str]]:
         """默认数据处理逻辑（如果数据源没有提供处理方法）"""
-        import urllib.parse
-
-        from ..config.constants import RECIPE_CATEGORIES
-
-        processed_recipes = []
-        seen_dishes = set()
+        # 热循环中使用局部变量，避免重复的全局/属性查找
+        unquote = urllib.parse.unquote
+        get_category_zh = RECIPE_CATEGORIES.get
+        unique_recipes: Dict[Tuple[str, str], Dict[str, str]] = {}  # (菜名, 英文分类) -> 食谱
+        add_recipe = unique_recipes.setdefault
 
         for item in raw_data:
             location = item.get("location", "")
-            if not location or "dishes/" not in location or "#" in location:
+            if "dishes/" not in location or "#" in location:
                 continue
 
-            parts = location.split("dishes/")
-            if len(parts) < 2:
+            # 解析 dishes/<分类>/<菜名>/
+            path_parts = location.partition("dishes/")[2].lstrip("/").split("/", 2)
+            if len(path_parts) < 2 or not path_parts[1]:
                 continue
 
-            path_parts = parts[1].strip("/").split("/")
-            if len(path_parts) < 2:
+            category_en, dish_name_encoded = path_parts[0], path_parts[1]
+            category_zh = get_category_zh(category_en)
+            if category_zh is None:
                 continue
 
-            category_en = path_parts[0]
-            dish_name_encoded = path_parts[1]
-
+            # 不含转义字符的菜名无需解码
             try:
-                dish_name = urllib.parse.unquote(dish_name_encoded)
+                dish_name = (
+                    unquote(dish_name_encoded) if "%" in dish_name_encoded else dish_name_encoded
+                )
             except Exception:
                 continue
 
-            if category_en not in RECIPE_CATEGORIES:
-                continue
-
-            category_zh = RECIPE_CATEGORIES[category_en]
-            dish_key = f"{dish_name}_{category_zh}"
-
-            if dish_key in seen_dishes:
+            # 解码后为空白的菜名（如 %20）无效
+            if not dish_name.strip():
                 continue
-            seen_dishes.add(dish_key)
 
-            processed_recipes.append({
-                "name": dish_name,
-                "category": category_en,
-                "category_zh": category_zh,
-                "url": location,
-            })
+            # 去重处理，保留首次出现的条目
+            add_recipe(
+                (dish_name, category_en),
+                {
+                    "name": dish_name,
+                    "category": category_en,
+                    "category_zh": category_zh,
+                    "url": location,
+                },
+            )
 
-        return processed_recipes
+        return list(unique_recipes.values())
 
     def _convert_to_recipes(self, processed_data: List[Dict[str, str]]) -> Dict[str, Recipe]:
         """将处理后的数据转换为Recipe对象"""
+        # 数据处理阶段已过滤空白菜名，分类和路径由解析保证非空，这里使用不做校验的构造函数
+        try:
+            return {recipe.name: recipe for recipe in (Recipe(**data) for data in processed_data)}
+        except (KeyError, TypeError):
+            # 存在字段缺失的数据时逐条校验转换，跳过无效条目
+            return self._convert_to_recipes_checked(processed_data)
+
+    def _convert_to_recipes_checked(
+        self, processed_data: List[Dict[str, str]]
+    ) -> Dict[str, Recipe]:
+        """逐条转换并跳过无效食谱数据"""
         recipes = {}
 
         for data in processed_data:
             try:
-                recipe = Recipe(
+                recipe = Recipe.validated(
                     name=data["name"],
                     category=data["category"],
                     category_zh=data["category_zh"],
@@ -168,18 +196,18 @@ class RecipeService:
         return recipes
 
     async def _background_cleanup(self) -> None:
-        """后台清理任务"""
+        """后台清理任务，按最早的缓存过期时间唤醒，空闲时不做周期性工作"""
         while True:
             try:
-                await asyncio.sleep(300)  # 每5分钟执行一次
-
-                if self._cache_service:
-                    cleared = self._cache_service.cleanup_expired()
-                    if cleared["total_cleared"] > 0:
-                        logger.debug(f"清理过期缓存: {cleared['total_cleared']} 个")
+                await self._cache_service.wait_for_expiry()
+                cleared = self._cache_service.cleanup_expired()
+                if cleared["total_cleared"] > 0:
+                    logger.debug(f"清理过期缓存: {cleared['total_cleared']} 个")
 
             except Exception as e:
                 logger.error(f"后台清理任务出错: {str(e)}")
+                # 出错后退避，避免截止时间未更新时空转占满事件循环
+                await asyncio.sleep(_CLEANUP_ERROR_BACKOFF)
 
     def _ensure_initialized(self) -> None:
         """确保服务已初始化"""
@@ -192,27 +220,23 @@ class RecipeService:
         self._stats["requests_total"] += 1
         self._stats["search_requests"] += 1
 
-        # 尝试从缓存获取
-        cached_result = self._cache_service.get_search_result(keyword)
-        if cached_result:
-            self._stats["cache_hits"] += 1
-            return cached_result
-
-        self._stats["cache_misses"] += 1
+        # 查询词只规范化一次，搜索与缓存键使用同一字符串，避免缓存结果与键对应不同的查询
+        # （用户输入不驻留，避免每个不同的查询都常驻内存）
+        keyword = keyword.strip()
+        cache_key = keyword.lower()
 
-        # 执行搜索
-        search_result = self._search_service.search_by_keyword(keyword)
-
-        # 格式化结果
-        from ..utils.formatters import ResponseFormatter
-
-        formatter = ResponseFormatter(self.config)
-        formatted_result = formatter.format_search_result(search_result)
+        # 缓存的是搜索结果对象，读取时再格式化
+        search_result = self._cache_service.get_search_result(cache_key)
+        if search_result is not None:
+            self._stats["cache_hits"] += 1
+        else:
+            self._stats["cache_misses"] += 1
 
-        # 缓存结果
-        self._cache_service.set_search_result(keyword, formatted_result)
+            # 执行搜索并缓存结果
+            search_result = self._search_service.search_by_keyword(keyword)
+            self._cache_service.set_search_result(cache_key, search_result)
 
-        return formatted_result
+        return self._formatter.format_search_result(search_result)
 
     async def get_random_recipe(self, category: Optional[str] = None) -> str:
         """获取随机推荐的食谱"""
@@ -222,42 +246,38 @@ class RecipeService:
 
         # 验证分类
         if category and not self._search_service.validate_category(category):
-            from ..utils.formatters import ResponseFormatter
-
-            formatter = ResponseFormatter(self.config)
             categories_info = self._search_service.get_categories_info()
-            return formatter.format_invalid_category(category, list(categories_info.keys()))
+            return self._formatter.format_invalid_category(
+                category, list(categories_info.keys())
+            )
 
-        # 尝试从缓存获取
+        # 尝试从缓存获取（缓存Recipe对象，读取时再格式化）
         cache_key = category or "all"
-        cached_result = self._cache_service.get_random_recipes(cache_key, 1)
-        if cached_result:
+        recipe = self._cache_service.get_random_recipes(cache_key, 1)
+        if recipe is not None:
             self._stats["cache_hits"] += 1
-            return cached_result
-
-        self._stats["cache_misses"] += 1
-
-        # 获取随机食谱
-        if category:
-            recipe = self._search_service.get_random_recipe_by_category(category)
-            if recipe:
-                result = f"🍽️ 推荐的{category}: {recipe.name}"
-            else:
-                result = f"😔 分类 '{category}' 下暂时没有菜品。"
         else:
-            recipes = self._search_service.get_random_recipes(1)
-            if recipes:
-                recipe = recipes[0]
-                result = f"🍽️ 推荐菜品: {recipe.name} ({recipe.category_zh})"
+            self._stats["cache_misses"] += 1
+
+            # 获取随机食谱
+            if category:
+                recipe = self._search_service.get_random_recipe_by_category(category)
             else:
-                result = "😔 暂无可推荐的菜品"
+                recipes = self._search_service.get_random_recipes(1)
+                recipe = recipes[0] if recipes else None
 
-        # 缓存结果
-        self._cache_service.set_random_recipes(
-            cache_key, 1, result, ttl=60
-        )  # 随机推荐缓存时间较短
+            # 随机推荐缓存时间较短；没有菜品时不缓存
+            if recipe is not None:
+                self._cache_service.set_random_recipes(cache_key, 1, recipe, ttl=60)
 
-        return result
+        if category:
+            if recipe is not None:
+                return f"🍽️ 推荐的{category}: {recipe.name}"
+            return f"😔 分类 '{category}' 下暂时没有菜品。"
+
+        if recipe is not None:
+            return f"🍽️ 推荐菜品: {recipe.name} ({recipe.category_zh})"
+        return "😔 暂无可推荐的菜品"
 
     async def get_recipe_url(self, dish_name: str) -> str:
         """获取菜品的制作方法URL"""
@@ -266,7 +286,7 @@ class RecipeService:
 
         recipe = self._search_service.find_by_name(dish_name)
         if recipe:
-            return f"📖 {recipe.name} 的制作方式：\n{recipe.full_url}"
+            return self._formatter.format_recipe_url(recipe)
         else:
             return f"❌ 未找到菜品: {dish_name}\n💡 建议使用 /菜谱搜索 查看可用菜品"
 
@@ -276,27 +296,22 @@ class RecipeService:
         self._stats["requests_total"] += 1
         self._stats["category_requests"] += 1
 
-        # 尝试从缓存获取
-        cached_result = self._cache_service.get_category_info("all")
-        if cached_result:
+        # 尝试从缓存获取，缓存内容为 (分类信息, 总数)
+        cached = self._cache_service.get_category_info("all")
+        if cached is not None:
             self._stats["cache_hits"] += 1
-            return cached_result
-
-        self._stats["cache_misses"] += 1
-
-        # 生成分类信息
-        categories_info = self._search_service.get_categories_info()
-        total_count = self._search_service.get_total_count()
-
-        from ..utils.formatters import ResponseFormatter
-
-        formatter = ResponseFormatter(self.config)
-        result = formatter.format_categories_info(categories_info, total_count)
+        else:
+            self._stats["cache_misses"] += 1
 
-        # 缓存结果
-        self._cache_service.set_category_info("all", result)
+            # 生成分类信息并缓存
+            cached = (
+                self._search_service.get_categories_info(),
+                self._search_service.get_total_count(),
+            )
+            self._cache_service.set_category_info("all", cached)
 
-        return result
+        categories_info, total_count = cached
+        return self._formatter.format_categories_info(categories_info, total_count)
 
     async def get_random_recipes_batch(self, count: int) -> str:
         """获取多个随机推荐"""
@@ -307,29 +322,18 @@ class RecipeService:
         # 限制数量范围
         count = max(self.config.min_random_count, min(count, self.config.max_random_count))
 
-        # 尝试从缓存获取
-        cached_result = self._cache_service.get_random_recipes("all", count)
-        if cached_result:
+        # 尝试从缓存获取（缓存Recipe列表，读取时再格式化）
+        recipes = self._cache_service.get_random_recipes("all", count)
+        if recipes is not None:
             self._stats["cache_hits"] += 1
-            return cached_result
-
-        self._stats["cache_misses"] += 1
-
-        # 获取随机食谱
-        recipes = self._search_service.get_random_recipes(count)
-
-        if not recipes:
-            result = "😔 暂无可推荐的菜品"
         else:
-            from ..utils.formatters import ResponseFormatter
+            self._stats["cache_misses"] += 1
 
-            formatter = ResponseFormatter(self.config)
-            result = formatter.format_random_recipes(recipes, count)
+            # 获取随机食谱并缓存
+            recipes = self._search_service.get_random_recipes(count)
+            self._cache_service.set_random_recipes("all", count, recipes, ttl=60)
 
-        # 缓存结果
-        self._cache_service.set_random_recipes("all", count, result, ttl=60)
-
-        return result
+        return self._formatter.format_random_recipes(recipes, count)
 
     async def reload_data(self) -> str:
         """重新加载数据"""
@@ -374,9 +378,20 @@ class RecipeService:
         """清理服务资源"""
         logger.info("开始清理食谱服务资源...")
 
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+
         if self._cache_service:
             self._cache_service.clear_all()
 
+        if self._source_opened:
+            self._source_opened = False
+            try:
+                await self._data_source.__aexit__(None, None, None)
+            except Exception as e:
+                logger.warning(f"关闭数据源失败: {str(e)}")
+
         self._recipes.clear()
         self._is_initialized = False
 
@@ -1,8 +1,11 @@
 """搜索服务实现"""
 
+import heapq
 import random
-from collections import defaultdict
-from typing import Dict, List, Optional, Set
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Set, Tuple
 
 from astrbot.api import logger
 
@@ -24,92 +27,147 @@ class RecipeSearchService:
         self.config = config
         self._recipes: Dict[str, Recipe] = recipes  # name -> Recipe
 
+        # 按列存储的只读数据，下标即食谱编号
+        self._recipe_list: Tuple[Recipe, ...] = ()
+        self._names_lower: Tuple[str, ...] = ()  # 与 _recipe_list 对齐的小写菜名
+
         # 索引结构
-        self._name_index: Dict[str, Recipe] = {}  # name -> Recipe (精确匹配)
-        self._category_index: Dict[str, List[Recipe]] = defaultdict(
-            list
-        )  # category_zh -> [Recipe]
-        self._keyword_index: Dict[str, Set[str]] = defaultdict(set)  # keyword -> {recipe_names}
+        self._name_index: Dict[str, Recipe] = {}  # 小写name -> Recipe (大小写不敏感匹配)
+        self._category_postings: Dict[str, array] = {}  # category_zh -> 食谱编号数组
+
+        # 只在重建索引时变化的统计结果
+        self._categories_info: Dict[str, int] = {}  # category_zh -> 食谱数量
+        self._category_postings_total = 0
+
+        # 以下子串与建议索引只服务于关键词搜索和搜索建议，首次使用时才构建
+        self._search_index_built = False
+
+        # 扁平菜名串：小写菜名以换行拼接，配合起始偏移量定位所属食谱
+        self._joined_names = ""
+        self._name_offsets: List[int] = []
 
-        # 随机推荐池（预计算）
-        self._random_pool: Dict[str, List[Recipe]] = {}  # category -> [Recipe]
-        self._all_recipes_list: List[Recipe] = []
+        # 搜索建议索引：有序的2-3字符词组和按小写排序的 (小写菜名, 菜名)，前缀查询用二分定位
+        self._suggestion_phrases: List[str] = []
+        self._names_by_lower: List[Tuple[str, str]] = []
 
         # 构建索引
         self._build_indexes()
 
-        logger.info(
-            f"搜索服务初始化完成: {len(self._recipes)} 个食谱, {len(self._keyword_index)} 个关键词"
-        )
+        logger.info(f"搜索服务初始化完成: {len(self._recipes)} 个食谱")
 
     def _build_indexes(self) -> None:
-        """构建所有索引结构"""
+        """构建基础索引结构，子串与建议索引延迟到首次搜索时构建"""
+        # 重建时丢弃旧的搜索索引
+        self._search_index_built = False
+        self._joined_names = ""
+        self._name_offsets = []
+        self._suggestion_phrases = []
+        self._names_by_lower = []
+
+        # 先清空基础列和索引，没有食谱数据时不会残留上一次的数据
+        self._recipe_list = ()
+        self._names_lower = ()
+        self._name_index = {}
+        self._category_postings = {}
+        self._categories_info = {}
+        self._category_postings_total = 0
+
         if not self._recipes:
             logger.warning("没有食谱数据，跳过索引构建")
             return
 
-        # 清空现有索引
-        self._name_index.clear()
-        self._category_index.clear()
-        self._keyword_index.clear()
-        self._random_pool.clear()
-        self._all_recipes_list.clear()
+        # 构建按列存储的只读数据
+        self._recipe_list = tuple(self._recipes.values())
+        # 小写菜名驻留后，各索引与查询共享同一字符串对象（菜名和分类在Recipe中已驻留）
+        self._names_lower = tuple(sys.intern(recipe.name.lower()) for recipe in self._recipe_list)
 
         # 构建基础索引
-        for recipe in self._recipes.values():
-            # 名称索引 (精确匹配)
-            self._name_index[recipe.name] = recipe
-            self._name_index[recipe.name.lower()] = recipe  # 支持大小写不敏感
-
-            # 分类索引
-            self._category_index[recipe.category_zh].append(recipe)
-
-            # 关键词索引 (支持部分匹配)
-            self._build_keyword_index(recipe)
+        name_index: Dict[str, Recipe] = {}
+        category_postings: Dict[str, array] = {}
+        for recipe_id, recipe in enumerate(self._recipe_list):
+            # 名称索引 (大小写不敏感；精确匹配直接使用 _recipes)
+            name_index[self._names_lower[recipe_id]] = recipe
+
+            # 分类索引，只保存食谱编号
+            postings = category_postings.get(recipe.category_zh)
+            if postings is None:
+                postings = category_postings[recipe.category_zh] = array("i")
+            postings.append(recipe_id)
+
+        self._name_index = name_index
+        self._category_postings = category_postings
+        self._categories_info = {
+            category_zh: len(postings) for category_zh, postings in category_postings.items()
+        }
+        self._category_postings_total = sum(self._categories_info.values())
 
-            # 添加到总列表
-            self._all_recipes_list.append(recipe)
+        logger.info(
+            f"索引构建完成: 名称索引{len(self._name_index)}, 分类{len(self._category_postings)}"
+        )
 
-        # 构建随机推荐池
-        self._build_random_pools()
+    def _ensure_search_index(self) -> None:
+        """首次关键词搜索或请求搜索建议时构建子串与建议索引"""
+        if self._search_index_built:
+            return
 
-        logger.info(
-            f"索引构建完成: 名称索引{len(self._name_index)}, 分类{len(self._category_index)}, 关键词{len(self._keyword_index)}"
+        # 构建子串匹配索引 (支持部分匹配)
+        self._build_flat_names()
+
+        # 构建搜索建议索引
+        self._build_suggestion_index()
+
+        # 全部构建成功后才标记，构建中途出错时下次调用会重新构建
+        self._search_index_built = True
+
+        logger.info(f"搜索索引构建完成: 建议词组{len(self._suggestion_phrases)}")
+
+    def _build_flat_names(self) -> None:
+        """构建扁平菜名串及各菜名的起始偏移量"""
+        offsets = []
+        position = 0
+        for name_lower in self._names_lower:
+            offsets.append(position)
+            position += len(name_lower) + 1
+        self._name_offsets = offsets
+        self._joined_names = "\n".join(self._names_lower)
+
+    def _build_suggestion_index(self) -> None:
+        """构建搜索建议索引"""
+        phrases = set()
+        for name_lower in self._names_lower:
+            for i in range(len(name_lower) - 1):
+                phrases.add(name_lower[i : i + 2])
+                if i + 3 <= len(name_lower):
+                    phrases.add(name_lower[i : i + 3])
+        self._suggestion_phrases = sorted(phrases)
+        self._names_by_lower = sorted(
+            zip(self._names_lower, (recipe.name for recipe in self._recipe_list))
         )
 
-    def _build_keyword_index(self, recipe: Recipe) -> None:
-        """为单个食谱构建关键词索引"""
-        # 提取关键词：菜名的每个字符和词组
-        name = recipe.name.lower()
-
-        # 单字符索引
-        for char in name:
-            if char.strip():  # 跳过空白字符
-                self._keyword_index[char].add(recipe.name)
-
-        # 2-3字符词组索引（对中文搜索很重要）
-        for i in range(len(name)):
-            for length in [2, 3]:
-                if i + length <= len(name):
-                    keyword = name[i : i + length]
-                    if keyword.strip():
-                        self._keyword_index[keyword].add(recipe.name)
-
-    def _build_random_pools(self) -> None:
-        """构建随机推荐池"""
-        # 按分类构建随机池
-        for category_zh, recipes in self._category_index.items():
-            if recipes:
-                # 预打乱顺序
-                pool = recipes.copy()
-                random.shuffle(pool)
-                self._random_pool[category_zh] = pool
-
-        # 全局随机池
-        if self._all_recipes_list:
-            global_pool = self._all_recipes_list.copy()
-            random.shuffle(global_pool)
-            self._random_pool[""] = global_pool  # 空字符串表示全部分类
+    def _matched_ids(self, keyword_lower: str) -> Set[int]:
+        """返回菜名包含关键词的食谱编号集合
+
+        在扁平菜名串上查找，跳过跨越两个菜名的匹配；编号均来自索引本身，无需再逐个校验。
+        食谱规模在数百条时单次查找只需微秒级，不再维护额外的后缀索引。
+        """
+        find = self._joined_names.find
+        offsets = self._name_offsets
+        names_lower = self._names_lower
+        keyword_len = len(keyword_lower)
+        matched_ids: Set[int] = set()
+
+        position = find(keyword_lower)
+        while position != -1:
+            recipe_id = bisect_right(offsets, position) - 1
+            end = offsets[recipe_id] + len(names_lower[recipe_id])
+            if position + keyword_len <= end:
+                # 命中后直接跳到下一个菜名，同一菜名只记录一次
+                matched_ids.add(recipe_id)
+                position = find(keyword_lower, end + 1)
+            else:
+                position = find(keyword_lower, position + 1)
+
+        return matched_ids
 
     def update_recipes(self, recipes: Dict[str, Recipe]) -> None:
         """更新食谱数据并重建索引"""
@@ -122,8 +180,8 @@ class RecipeSearchService:
         if not name.strip():
             return None
 
-        # 先尝试精确匹配
-        recipe = self._name_index.get(name)
+        # 先尝试精确匹配；用户输入不驻留，避免每个不同的查询都常驻内存
+        recipe = self._recipes.get(name)
         if recipe:
             return recipe
 
@@ -137,106 +195,71 @@ class RecipeSearchService:
 
         max_results = max_results or self.config.max_search_results
         keyword_lower = keyword.lower()
+        self._ensure_search_index()
 
-        # 收集匹配的食谱名称
-        matched_names: Set[str] = set()
-
-        # 精确关键词匹配
-        if keyword_lower in self._keyword_index:
-            matched_names.update(self._keyword_index[keyword_lower])
+        # 收集匹配的食谱编号
+        matched_ids = self._matched_ids(keyword_lower)
 
-        # 部分匹配：查找包含关键词的所有关键词索引
-        for indexed_keyword, recipe_names in self._keyword_index.items():
-            if keyword_lower in indexed_keyword:
-                matched_names.update(recipe_names)
+        # 只取相关性最高的前 max_results 个，分数越小越相关：
+        # 精确匹配为0，开头匹配为1，其余按关键词出现位置递增；关键词和小写菜名表在闭包中只绑定一次
+        names_lower = self._names_lower
 
-        # 转换为Recipe对象并去重
-        matched_recipes = []
-        seen_names = set()
+        def score(recipe_id: int) -> int:
+            name_lower = names_lower[recipe_id]
+            if name_lower == keyword_lower:
+                return 0
+            position = name_lower.find(keyword_lower)
+            if position == 0:
+                return 1
+            return 2 + position if position > 0 else 1000
 
-        for name in matched_names:
-            if name not in seen_names and name in self._recipes:
-                matched_recipes.append(self._recipes[name])
-                seen_names.add(name)
-
-        # 按相关性排序（简单的相关性：名称中关键词出现的位置）
-        matched_recipes.sort(key=lambda r: self._calculate_relevance(r.name, keyword_lower))
+        top_ids = heapq.nsmallest(max_results, matched_ids, key=score)
 
         # 分页处理
-        total_count = len(matched_recipes)
+        total_count = len(matched_ids)
         has_more = total_count > max_results
-        shown_recipes = matched_recipes[:max_results]
+        shown_recipes = [self._recipe_list[i] for i in top_ids]
 
         return SearchResult(
             recipes=shown_recipes, total_count=total_count, has_more=has_more, query=keyword
         )
 
-    def _calculate_relevance(self, recipe_name: str, keyword: str) -> int:
-        """计算搜索相关性分数（越小越相关）"""
-        name_lower = recipe_name.lower()
-
-        # 精确匹配得分最高
-        if name_lower == keyword:
-            return 0
-
-        # 开头匹配得分较高
-        if name_lower.startswith(keyword):
-            return 1
-
-        # 包含匹配
-        if keyword in name_lower:
-            return 2 + name_lower.index(keyword)  # 位置越靠前得分越高
-
-        # 其他情况
-        return 1000
-
     def get_recipes_by_category(
         self, category_zh: str, max_results: Optional[int] = None
     ) -> List[Recipe]:
         """获取指定分类的食谱列表"""
-        if category_zh not in self._category_index:
+        postings = self._category_postings.get(category_zh)
+        if not postings:
             return []
 
-        recipes = self._category_index[category_zh]
-        if max_results and len(recipes) > max_results:
-            return recipes[:max_results]
+        if max_results and len(postings) > max_results:
+            postings = postings[:max_results]
 
-        return recipes
+        recipe_list = self._recipe_list
+        return [recipe_list[i] for i in postings]
 
     def get_random_recipes(self, count: int, category_zh: Optional[str] = None) -> List[Recipe]:
         """获取随机食谱推荐 - 高性能实现"""
         # 限制推荐数量
         count = max(self.config.min_random_count, min(count, self.config.max_random_count))
 
-        # 选择对应的随机池
-        pool_key = category_zh if category_zh and category_zh in self._random_pool else ""
+        # 直接在只读序列上采样，未指定或未知分类时从全部食谱中采样
+        recipe_list = self._recipe_list
+        postings = self._category_postings.get(category_zh) if category_zh else None
+        if postings:
+            return [recipe_list[i] for i in random.sample(postings, min(count, len(postings)))]
 
-        if pool_key not in self._random_pool:
-            return []
-
-        pool = self._random_pool[pool_key]
-        if not pool:
-            return []
-
-        # 如果请求数量大于池大小，返回整个池
-        if count >= len(pool):
-            return pool.copy()
-
-        # 随机采样
-        return random.sample(pool, count)
+        # 请求数量大于池大小时返回整个池（顺序随机）
+        return random.sample(recipe_list, min(count, len(recipe_list)))
 
     def get_random_recipe_by_category(self, category_zh: str) -> Optional[Recipe]:
         """获取指定分类的随机食谱"""
-        recipes = self.get_random_recipes(1, category_zh)
-        return recipes[0] if recipes else None
+        postings = self._category_postings.get(category_zh)
+        return self._recipe_list[random.choice(postings)] if postings else None
 
     def get_categories_info(self) -> Dict[str, int]:
-        """获取所有分类及其食谱数量"""
-        return {
-            category_zh: len(recipes)
-            for category_zh, recipes in self._category_index.items()
-            if recipes  # 只返回有食谱的分类
-        }
+        """获取所有分类及其食谱数量（索引构建时预先计算，返回副本，调用方修改不影响索引）"""
+        return dict(self._categories_info)
 
     def get_total_count(self) -> int:
         """获取总食谱数量"""
@@ -244,7 +267,7 @@ class RecipeSearchService:
 
     def validate_category(self, category_zh: str) -> bool:
         """验证分类是否存在且有食谱"""
-        return category_zh in self._category_index and len(self._category_index[category_zh]) > 0
+        return category_zh in self._categories_info  # 只统计非空分类
 
     def get_search_suggestions(self, partial_keyword: str, max_suggestions: int = 5) -> List[str]:
         """获取搜索建议（自动补全）"""
@@ -253,16 +276,24 @@ class RecipeSearchService:
 
         partial_lower = partial_keyword.lower()
         suggestions = set()
-
-        # 从关键词索引中查找匹配的关键词
-        for keyword in self._keyword_index.keys():
-            if keyword.startswith(partial_lower) and len(keyword) > len(partial_lower):
-                suggestions.add(keyword)
-
-        # 从食谱名称中查找匹配的名称
-        for recipe_name in self._recipes.keys():
-            if recipe_name.lower().startswith(partial_lower):
-                suggestions.add(recipe_name)
+        self._ensure_search_index()
+
+        # 以输入开头、比输入更长的2-3字符词组；结果按字典序截断，只需取区间内前若干个
+        phrases = self._suggestion_phrases
+        for i in range(bisect_left(phrases, partial_lower), len(phrases)):
+            phrase = phrases[i]
+            if not phrase.startswith(partial_lower) or len(suggestions) >= max_suggestions:
+                break
+            if len(phrase) > len(partial_lower):
+                suggestions.add(phrase)
+
+        # 小写形式以输入开头的菜名
+        names_by_lower = self._names_by_lower
+        for i in range(bisect_left(names_by_lower, (partial_lower,)), len(names_by_lower)):
+            name_lower, recipe_name = names_by_lower[i]
+            if not name_lower.startswith(partial_lower):
+                break
+            suggestions.add(recipe_name)
 
         # 转换为列表并排序
         suggestion_list = sorted(list(suggestions))
@@ -272,13 +303,11 @@ class RecipeSearchService:
         """获取搜索服务统计信息"""
         return {
             "total_recipes": len(self._recipes),
-            "total_categories": len(self._category_index),
-            "total_keywords": len(self._keyword_index),
+            "total_categories": len(self._category_postings),
+            "search_index_built": self._search_index_built,
             "categories_info": self.get_categories_info(),
             "index_sizes": {
                 "name_index": len(self._name_index),
-                "category_index": sum(len(recipes) for recipes in self._category_index.values()),
-                "keyword_index": sum(len(names) for names in self._keyword_index.values()),
-                "random_pools": {k: len(v) for k, v in self._random_pool.items()},
+                "category_index": self._category_postings_total,
             },
         }
@@ -1,11 +1,93 @@
 """吃点啥"""
 
+import functools
 import logging
 import random
 import urllib.parse
+from dataclasses import dataclass
 
 import requests
 
+try:
+    import ijson
+
+    _PARSE_ERRORS = (ValueError, ijson.JSONError)
+except ImportError:  # ijson 为可选依赖，缺失时整体解析响应
+    ijson = None
+    _PARSE_ERRORS = (ValueError,)
+
+
+# 重复的菜名编码只解码一次
+_unquote = functools.lru_cache(maxsize=4096)(urllib.parse.unquote)
+
+# 流式读取响应时每次从网络取回的字节数
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkReader:
+    """把 response.iter_content 的分块适配为 ijson 可读取的文件对象
+
+    经由 iter_content 读取时，底层 urllib3 异常会被 requests 包装为 RequestException
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, size=-1):
+        """读取至多 size 个字节，size 为负数时读取剩余全部内容"""
+        if size is None or size < 0:
+            data, self._buffer = self._buffer + b"".join(self._chunks), b""
+            return data
+
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+@dataclass(frozen=True, slots=True)
+class RecipeSnapshot:
+    """一次加载得到的食谱数据及其派生索引
+
+    重新加载时整体构建后一次性替换，读取方不会看到只更新了一半的数据
+    """
+
+    recipes: dict  # 分类 -> {菜名: URL}
+    dish_index: dict  # 菜名 -> (分类, 完整URL)，用于O(1)查找
+    by_category_list: dict  # 分类 -> [菜名]
+    all_dishes: list  # (分类, 菜名)，随机推荐直接采样
+    search_corpus: tuple  # (分类, 菜名, 小写菜名)，避免每次搜索重复转换大小写
+
+    @classmethod
+    def build(cls, recipes, dish_index):
+        """根据分类数据构建快照及派生索引"""
+        by_category_list = {category_zh: list(dishes) for category_zh, dishes in recipes.items()}
+        return cls(
+            recipes=recipes,
+            dish_index=dish_index,
+            by_category_list=by_category_list,
+            all_dishes=[
+                (category_zh, dish_name)
+                for category_zh, dishes in by_category_list.items()
+                for dish_name in dishes
+            ],
+            search_corpus=tuple(
+                (category_zh, dish_name, dish_name.casefold())
+                for category_zh, dishes in by_category_list.items()
+                for dish_name in dishes
+            ),
+        )
+
+    @property
+    def total_count(self):
+        """菜品总数（菜名全局去重）"""
+        return len(self.dish_index)
+
 
 class Recipes:
     """食谱获取与管理类"""
@@ -27,69 +109,101 @@ class Recipes:
     TYPES_ZH_TO_EN = {type_zh: type_en for type_en, type_zh in TYPES.items()}
 
     def __init__(self):
-        self.recipes = {type_zh: {} for type_zh in self.TYPES.values()}  # 改为字典存储菜名和URL
-        self.total_count = 0
+        self._snapshot = RecipeSnapshot.build(self._empty_recipes(), {})
+        self._help_cache = None  # 帮助信息缓存，数据重新处理时失效
+        self._what_we_have_cache = {}  # 分类 -> 菜品列表文本
         self._fetch_and_process_recipes()
 
+    @property
+    def recipes(self):
+        """分类 -> {菜名: URL}"""
+        return self._snapshot.recipes
+
+    @property
+    def total_count(self):
+        """菜品总数"""
+        return self._snapshot.total_count
+
+    def _empty_recipes(self):
+        """创建空的分类结构"""
+        return {type_zh: {} for type_zh in self.TYPES.values()}  # 字典存储菜名和URL
+
     def _fetch_and_process_recipes(self):
         """从远程获取并处理食谱数据"""
         try:
-            response = requests.get(self.BASE_URL, timeout=10)
-            response.raise_for_status()
-            data = response.json().get("docs", [])
-            self._process_recipes(data)
+            # with 语句保证流式响应的连接在处理结束或出错时释放
+            with requests.get(self.BASE_URL, timeout=10, stream=ijson is not None) as response:
+                response.raise_for_status()
+                if ijson is not None:
+                    # 流式解析，逐条处理 docs 中的文档，不在内存中保留整个响应
+                    chunks = response.iter_content(chunk_size=_STREAM_CHUNK_SIZE)
+                    data = ijson.items(_ChunkReader(chunks), "docs.item")
+                else:
+                    data = response.json().get("docs", [])
+                self._process_recipes(data)
         except requests.RequestException as e:
             logging.error(f"请求失败: {e}")
-        except ValueError as e:
+        except _PARSE_ERRORS as e:
             logging.error(f"解析响应失败: {e}")
 
     def _process_recipes(self, data):
-        """处理并分类存储食谱数据"""
-        if not data:
-            logging.error("未获取到食谱数据。")
-            return
-
-        dish_urls = {}  # 用于去重和存储完整URL
+        """处理并分类存储食谱数据，data 可以是列表或流式解析得到的迭代器"""
+        # 在局部变量中构建新数据，完成后再整体替换
+        recipes = self._empty_recipes()
+        dish_index = {}
 
+        item_count = 0
         for item in data:
-            location = item.get("location", "")
-            if not location or "dishes/" not in location or "#" in location:
-                continue
+            item_count += 1
+            self._process_one(item, recipes, dish_index)
 
-            # 解析URL结构: dishes/category/dish_name/
-            parts = location.split("dishes/")
-            if len(parts) < 2:
-                continue
+        if not item_count:
+            logging.error("未获取到食谱数据。")
+            return
 
-            path_parts = parts[1].strip("/").split("/")
-            if len(path_parts) < 2:
-                continue
+        # 原子替换快照并清空依赖旧数据的文本缓存
+        self._snapshot = RecipeSnapshot.build(recipes, dish_index)
+        self._help_cache = None
+        self._what_we_have_cache = {}
 
-            category = path_parts[0]
-            dish_name_encoded = path_parts[1]
+        if self.total_count == 0:
+            logging.warning("没有找到有效的菜谱数据")
 
-            # URL解码获取菜名
-            try:
-                dish_name = urllib.parse.unquote(dish_name_encoded)
-            except Exception:
-                continue
+    def _process_one(self, item, recipes, dish_index):
+        """处理单条文档，有效的菜品写入 recipes 和 dish_index"""
+        location = item.get("location", "")
+        if not location.startswith("dishes/") or "#" in location:
+            return
 
-            # 检查分类是否存在
-            if category not in self.TYPES:
-                continue
+        # 解析URL结构: dishes/category/dish_name/，用 find 定位分隔符，不构建中间列表
+        category_end = location.find("/", 7)
+        if category_end <= 7:
+            return
 
-            category_zh = self.TYPES[category]
+        name_end = location.find("/", category_end + 1)
+        category = location[7:category_end]
+        dish_name_encoded = location[category_end + 1 : name_end if name_end > 0 else None]
+        if not dish_name_encoded:
+            return
+
+        # URL解码获取菜名，不含转义字符时无需解码
+        try:
+            dish_name = (
+                _unquote(dish_name_encoded) if "%" in dish_name_encoded else dish_name_encoded
+            )
+        except Exception:
+            return
 
-            # 存储菜名和对应的URL（去重）
-            if dish_name not in dish_urls:
-                dish_urls[dish_name] = location
-                self.recipes[category_zh][dish_name] = location
+        # 检查分类是否存在
+        if category not in self.TYPES:
+            return
 
-        # 统计总数
-        self.total_count = sum(len(dishes) for dishes in self.recipes.values())
+        category_zh = self.TYPES[category]
 
-        if self.total_count == 0:
-            logging.warning("没有找到有效的菜谱数据")
+        # 存储菜名和对应的URL（去重）
+        if dish_name not in dish_index:
+            dish_index[dish_name] = (category_zh, self.SITE_URL + location)
+            recipes[category_zh][dish_name] = location
 
     def all_recipes(self):
         """获取所有分类及菜品"""
@@ -97,18 +211,25 @@ class Recipes:
 
     def random_recipe(self, category):
         """随机获取指定分类中的菜品"""
-        if category not in self.recipes:
+        dishes = self._snapshot.by_category_list.get(category)
+        if dishes is None:
             logging.warning(f"未知分类: {category}")
             return f"未知分类: {category}"
 
-        if not self.recipes[category]:
+        if not dishes:
             logging.warning(f"分类 '{category}' 下没有菜品。")
             return f"分类 '{category}' 下没有菜品。"
 
-        selected_dish = random.choice(list(self.recipes[category].keys()))
+        selected_dish = random.choice(dishes)
         return f"推荐的{category}: {selected_dish}。"
 
     def help(self):
+        """获取帮助信息"""
+        if self._help_cache is None:
+            self._help_cache = self._build_help()
+        return self._help_cache
+
+    def _build_help(self):
         """生成帮助信息"""
         msgs = ["🍳 食谱系统帮助"]
         msgs.append("=" * 20)
@@ -124,12 +245,9 @@ class Recipes:
 
     def how_to_cook(self, food):
         """获取菜品的制作方式"""
-        # 在所有分类中查找菜品
-        for category, dishes in self.recipes.items():
-            if food in dishes:
-                dish_url = dishes[food]
-                full_url = self.SITE_URL + dish_url
-                return f"📖 {food} 的制作方式：\n{full_url}"
+        hit = self._snapshot.dish_index.get(food)
+        if hit:
+            return f"📖 {food} 的制作方式：\n{hit[1]}"
 
         logging.warning(f"未找到菜品: {food}")
         return f"❌ 未找到菜品: {food}\n💡 建议使用 /what_we_have <分类> 查看可用菜品"
@@ -140,7 +258,14 @@ class Recipes:
             available_categories = ", ".join(self.recipes.keys())
             return f"❌ 未知分类: {category}\n🏷️ 可用分类: {available_categories}"
 
-        dishes = list(self.recipes[category].keys())
+        cached = self._what_we_have_cache.get(category)
+        if cached is None:
+            cached = self._what_we_have_cache[category] = self._build_what_we_have(category)
+        return cached
+
+    def _build_what_we_have(self, category):
+        """生成指定分类下的菜品列表文本"""
+        dishes = self._snapshot.by_category_list[category]
         if dishes:
             # 如果菜品太多，只显示前20个并提示总数
             if len(dishes) > 20:
@@ -155,11 +280,12 @@ class Recipes:
 
     def search_recipe(self, keyword):
         """根据关键词搜索菜品"""
-        results = []
-        for category, dishes in self.recipes.items():
-            for dish_name in dishes.keys():
-                if keyword.lower() in dish_name.lower():
-                    results.append((category, dish_name))
+        keyword_folded = keyword.casefold()
+        results = [
+            (category, dish_name)
+            for category, dish_name, dish_name_folded in self._snapshot.search_corpus
+            if keyword_folded in dish_name_folded
+        ]
 
         if not results:
             return f"🔍 没有找到包含 '{keyword}' 的菜品"
@@ -174,11 +300,7 @@ class Recipes:
 
     def get_random_recipes(self, count=5):
         """获取随机推荐的菜品"""
-        all_dishes = []
-        for category, dishes in self.recipes.items():
-            for dish_name in dishes.keys():
-                all_dishes.append((category, dish_name))
-
+        all_dishes = self._snapshot.all_dishes
         if not all_dishes:
             return "😔 暂无可推荐的菜品"
 
@@ -195,9 +317,8 @@ recipes = Recipes()
 if __name__ == "__main__":
     print("=== 升级版食谱系统测试 ===\n")
 
-    # 初始化食谱系统
+    # 复用模块级实例，避免重复拉取数据
     print("1. 初始化食谱系统...")
-    recipes = Recipes()
     print("✓ 食谱系统初始化完成\n")
 
     # 测试帮助信息
@@ -5,6 +5,16 @@ from typing import Any, Dict, List
 from ..config.settings import RecipeConfig
 from ..models.recipe import Recipe, SearchResult
 
+# 分类信息末尾固定的指令说明
+_CATEGORIES_HELP_LINES = (
+    "\n🔧 可用指令:",
+    "• /吃点啥 [分类] - 随机推荐菜品",
+    "• /菜谱分类 - 查看所有分类",
+    "• /菜谱搜索 <关键词> - 搜索菜品",
+    "• /怎么做 <菜名> - 获取制作方法",
+    "• /随机推荐 - 随机推荐3道菜",
+)
+
 
 class ResponseFormatter:
     """响应格式化器
@@ -20,56 +30,40 @@ class ResponseFormatter:
         if search_result.is_empty:
             return f"🔍 没有找到包含 '{search_result.query}' 的菜品"
 
-        # 构建结果列表
-        result_lines = []
-        for recipe in search_result.recipes:
-            result_lines.append(f"• {recipe.name} ({recipe.category_zh})")
-
-        result_text = "\n".join(result_lines)
-
         # 添加统计信息
         if search_result.has_more:
             header = f"🔍 搜索 '{search_result.query}' 的结果（显示前{search_result.shown_count}个，共{search_result.total_count}个）："  # noqa: E501
-            footer = f"\n\n... 还有 {search_result.total_count - search_result.shown_count} 个结果"
-            return f"{header}\n{result_text}{footer}"
         else:
             header = f"🔍 搜索 '{search_result.query}' 的结果（共{search_result.total_count}个）："
-            return f"{header}\n{result_text}"
+
+        # 标题、结果列表和结尾一次拼接
+        lines = [header, *[f"• {r.name} ({r.category_zh})" for r in search_result.recipes]]
+        if search_result.has_more:
+            remaining = search_result.total_count - search_result.shown_count
+            lines.append(f"\n... 还有 {remaining} 个结果")
+        return "\n".join(lines)
 
     def format_random_recipes(self, recipes: List[Recipe], requested_count: int) -> str:
         """格式化随机推荐结果"""
         if not recipes:
             return "😔 暂无可推荐的菜品"
 
-        actual_count = len(recipes)
-        result_lines = []
-
-        for recipe in recipes:
-            result_lines.append(f"• {recipe.name} ({recipe.category_zh})")
-
-        result_text = "\n".join(result_lines)
-        return f"🎲 随机推荐 {actual_count} 道菜：\n{result_text}"
+        header = f"🎲 随机推荐 {len(recipes)} 道菜："
+        return "\n".join([header, *[f"• {r.name} ({r.category_zh})" for r in recipes]])
 
     def format_categories_info(self, categories_info: Dict[str, int], total_count: int) -> str:
         """格式化分类信息"""
-        lines = ["🍳 吃点啥 - 食谱助手"]
-        lines.append("=" * 25)
-        lines.append("📊 分类及菜品数量:")
-
         # 按菜品数量排序显示
         sorted_categories = sorted(categories_info.items(), key=lambda x: x[1], reverse=True)
 
-        for category_zh, count in sorted_categories:
-            lines.append(f"  {category_zh}: {count} 种菜品")
-
-        lines.append(f"\n📈 总计: {total_count} 种菜品")
-        lines.append("\n🔧 可用指令:")
-        lines.append("• /吃点啥 [分类] - 随机推荐菜品")
-        lines.append("• /菜谱分类 - 查看所有分类")
-        lines.append("• /菜谱搜索 <关键词> - 搜索菜品")
-        lines.append("• /怎么做 <菜名> - 获取制作方法")
-        lines.append("• /随机推荐 - 随机推荐3道菜")
-
+        lines = [
+            "🍳 吃点啥 - 食谱助手",
+            "=" * 25,
+            "📊 分类及菜品数量:",
+            *[f"  {category_zh}: {count} 种菜品" for category_zh, count in sorted_categories],
+            f"\n📈 总计: {total_count} 种菜品",
+            *_CATEGORIES_HELP_LINES,
+        ]
         return "\n".join(lines)
 
     def format_category_recipes(self, category_zh: str, recipes: List[Recipe]) -> str:
@@ -81,14 +75,13 @@ class ResponseFormatter:
         max_display = self.config.max_category_display
 
         if total_count > max_display:
-            shown_recipes = recipes[:max_display]
-            result_lines = [f"• {recipe.name}" for recipe in shown_recipes]
-            result_text = "\n".join(result_lines)
-            return f"🍽️ {category_zh} 分类下的菜品（显示前{max_display}个，共{total_count}个）：\n{result_text}\n\n... 还有 {total_count - max_display} 个菜品"  # noqa: E501
+            header = f"🍽️ {category_zh} 分类下的菜品（显示前{max_display}个，共{total_count}个）："  # noqa: E501
+            lines = [header, *[f"• {recipe.name}" for recipe in recipes[:max_display]]]
+            lines.append(f"\n... 还有 {total_count - max_display} 个菜品")
         else:
-            result_lines = [f"• {recipe.name}" for recipe in recipes]
-            result_text = "\n".join(result_lines)
-            return f"🍽️ {category_zh} 分类下的菜品（共{total_count}个）：\n{result_text}"
+            header = f"🍽️ {category_zh} 分类下的菜品（共{total_count}个）："
+            lines = [header, *[f"• {recipe.name}" for recipe in recipes]]
+        return "\n".join(lines)
 
     def format_invalid_category(self, invalid_category: str, valid_categories: List[str]) -> str:
         """格式化无效分类的错误信息"""
@@ -120,8 +113,7 @@ class ResponseFormatter:
 
     def format_stats(self, stats: Dict[str, Any]) -> str:
         """格式化统计信息"""
-        lines = ["📊 食谱插件统计信息"]
-        lines.append("=" * 25)
+        lines = ["📊 食谱插件统计信息", "=" * 25]
 
         # 基本信息
         if "total_recipes" in stats:
@@ -130,22 +122,23 @@ class ResponseFormatter:
         # 请求统计
         if "requests" in stats:
             req_stats = stats["requests"]
-            lines.append(f"🔍 总请求数: {req_stats.get('requests_total', 0)}")
-            lines.append(f"   搜索请求: {req_stats.get('search_requests', 0)}")
-            lines.append(f"   随机推荐: {req_stats.get('random_requests', 0)}")
-            lines.append(f"   分类查询: {req_stats.get('category_requests', 0)}")
+            lines.extend((
+                f"🔍 总请求数: {req_stats.get('requests_total', 0)}",
+                f"   搜索请求: {req_stats.get('search_requests', 0)}",
+                f"   随机推荐: {req_stats.get('random_requests', 0)}",
+                f"   分类查询: {req_stats.get('category_requests', 0)}",
+            ))
 
         # 缓存统计
         if "cache_service" in stats:
             cache_stats = stats["cache_service"]
             lines.append("\n💾 缓存统计:")
-
-            for cache_type, cache_info in cache_stats.items():
-                if isinstance(cache_info, dict) and "hit_rate" in cache_info:
-                    hit_rate = cache_info["hit_rate"]
-                    size = cache_info.get("size", 0)
-                    max_size = cache_info.get("max_size", 0)
-                    lines.append(f"   {cache_type}: {size}/{max_size} 命中率{hit_rate:.1%}")
+            lines.extend(
+                f"   {cache_type}: {cache_info.get('size', 0)}/{cache_info.get('max_size', 0)}"
+                f" 命中率{cache_info['hit_rate']:.1%}"
+                for cache_type, cache_info in cache_stats.items()
+                if isinstance(cache_info, dict) and "hit_rate" in cache_info
+            )
 
         # 搜索服务统计
         if "search_service" in stats and "categories_info" in stats["search_service"]:
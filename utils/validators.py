@@ -1,10 +1,79 @@
 """数据验证工具"""
 
+import functools
+import ipaddress
 import re
-from typing import Any, Dict, List
+import string
+from typing import Any, Dict, Final, List, Optional, Pattern, Tuple
+from urllib.parse import urlsplit
 
 from ..config.settings import RecipeConfig
 
+# 预编译的正则表达式，避免每次验证时查找 re 模块的内部缓存
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+
+# 删除非法字符的转换表：translate 后与原串不同即说明含有非法字符，短字符串上比正则更快
+_ILLEGAL_NAME_CHARS = '<>:"/\\|?*'
+_ILLEGAL_NAME_TABLE = str.maketrans("", "", _ILLEGAL_NAME_CHARS)
+_DANGEROUS_FILENAME_TABLE = str.maketrans(
+    "", "", _ILLEGAL_NAME_CHARS + "".join(map(chr, range(0x20)))
+)
+
+# 搜索关键词允许的ASCII字符，其余只允许常用汉字和空白
+_KEYWORD_ASCII_CHARS = frozenset(string.ascii_letters + string.digits)
+
+# 各命令的参数验证方式: 命令 -> ((参数名, 验证方法名), ...)
+_COMMAND_SCHEMA = {
+    "search": (
+        ("keyword", "validate_search_keyword"),
+        ("limit", "validate_search_results_limit"),
+    ),
+    "random": (("count", "validate_random_count"),),
+    "recipe_url": (("dish_name", "validate_recipe_name"),),
+}
+
+# 配置参数规则: (字段, 类型, 取值检查, 错误原因)
+_CONFIG_RULES = (
+    ("request_timeout", (int, float), lambda v: v > 0, "必须是正数"),
+    ("max_retries", int, lambda v: v >= 0, "必须是非负整数"),
+    ("cache_ttl", int, lambda v: v > 0, "必须是正整数"),
+    *(
+        (field, int, lambda v: v > 0, "必须是正整数")
+        for field in ("max_search_results", "max_random_results", "max_category_display")
+    ),
+)
+
+# Windows 保留文件名
+_RESERVED_FILENAMES = frozenset(
+    {"CON", "PRN", "AUX", "NUL"}
+    | {f"COM{i}" for i in range(1, 10)}
+    | {f"LPT{i}" for i in range(1, 10)}
+)
+
+# URL验证：先比较协议前缀，再交给 urlsplit 拆分，只对主机名做正则匹配
+_URL_SCHEMES = ("http://", "https://", "ftp://", "ftps://")
+_MAX_URL_LENGTH = 2048
+# 域名按点拆分后逐个标签匹配，正则中没有嵌套量词，匹配时间与标签长度成线性（urlsplit 已转为小写）
+_HOST_LABEL_RE: Final[Pattern[str]] = re.compile(r"[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?")
+_TLD_RE: Final[Pattern[str]] = re.compile(r"[a-z]{2,6}")
+_WHITESPACE_RE = re.compile(r"\s")
+
+
+def _is_keyword_text(text: str) -> bool:
+    """检查文本是否只包含中文、英文、数字和空白（关键词已限长，逐字符判断比正则更快）"""
+    return all(
+        c in _KEYWORD_ASCII_CHARS or "\u4e00" <= c <= "\u9fa5" or c.isspace() for c in text
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _format_category_list(categories: Tuple[str, ...]) -> str:
+    """格式化可用分类提示，分类列表通常固定，结果按内容缓存"""
+    valid_list = ", ".join(categories[:5])  # 只显示前5个
+    if len(categories) > 5:
+        valid_list += f" 等{len(categories)}个分类"
+    return valid_list
+
 
 class ValidationError(Exception):
     """验证错误异常"""
@@ -24,97 +93,123 @@ class DataValidator:
 
     def __init__(self, config: RecipeConfig) -> None:
         self.config = config
+        # 配置在创建验证器前已校验且之后不变，数量上下限预先取出
+        self._random_bounds = (config.min_random_count, config.max_random_count)
+        self._search_limit_bounds = (1, config.max_search_results)
+
+    def _require_nonempty_str(
+        self,
+        field: str,
+        value: Any,
+        empty_reason: str = "不能为空",
+        type_reason: str = "必须是字符串类型",
+    ) -> str:
+        """检查值为非空字符串，返回去除首尾空白后的结果"""
+        if not isinstance(value, str):
+            raise ValidationError(field, value, type_reason)
+
+        value = value.strip()
+        if not value:
+            raise ValidationError(field, value, empty_reason)
+
+        return value
 
     def validate_recipe_name(self, name: Any) -> str:
         """验证食谱名称"""
-        if not isinstance(name, str):
-            raise ValidationError("recipe_name", name, "必须是字符串类型")
-
-        name = name.strip()
-        if not name:
-            raise ValidationError("recipe_name", name, "不能为空")
+        name = self._require_nonempty_str("recipe_name", name)
 
         if len(name) > 100:
             raise ValidationError("recipe_name", name, "长度不能超过100个字符")
 
         # 检查是否包含非法字符
-        if re.search(r'[<>:"/\\|?*]', name):
+        if name.translate(_ILLEGAL_NAME_TABLE) != name:
             raise ValidationError("recipe_name", name, "包含非法字符")
 
         return name
 
     def validate_category(self, category: Any, valid_categories: List[str]) -> str:
         """验证分类"""
-        if not isinstance(category, str):
-            raise ValidationError("category", category, "必须是字符串类型")
-
-        category = category.strip()
-        if not category:
-            raise ValidationError("category", category, "不能为空")
+        category = self._require_nonempty_str("category", category)
 
         if category not in valid_categories:
-            valid_list = ", ".join(valid_categories[:5])  # 只显示前5个
-            if len(valid_categories) > 5:
-                valid_list += f" 等{len(valid_categories)}个分类"
+            valid_list = _format_category_list(tuple(valid_categories))
             raise ValidationError("category", category, f"无效分类，可用分类: {valid_list}")
 
         return category
 
     def validate_url(self, url: Any) -> str:
         """验证URL"""
-        if not isinstance(url, str):
-            raise ValidationError("url", url, "必须是字符串类型")
-
-        url = url.strip()
-        if not url:
-            raise ValidationError("url", url, "不能为空")
-
-        # 简单的URL格式验证
-        url_pattern = re.compile(
-            r"^(?:http|ftp)s?://"  # http:// or https://
-            r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|"  # domain...
-            r"localhost|"  # localhost...
-            r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
-            r"(?::\d+)?"  # optional port
-            r"(?:/?|[/?]\S+)$",
-            re.IGNORECASE,
-        )
+        url = self._require_nonempty_str("url", url)
 
-        if not url_pattern.match(url) and not url.startswith("/"):
+        # 先检查长度，之后的解析和正则匹配只处理有界输入
+        if len(url) > _MAX_URL_LENGTH:
+            raise ValidationError("url", url, f"长度不能超过{_MAX_URL_LENGTH}个字符")
+
+        # 相对路径直接通过
+        if url.startswith("/"):
+            return url
+
+        if not url[:8].lower().startswith(_URL_SCHEMES) or _WHITESPACE_RE.search(url):
+            raise ValidationError("url", url, "URL格式无效")
+
+        try:
+            parts = urlsplit(url)
+            parts.port  # 端口非数字或越界时抛出 ValueError
+        except ValueError:
+            raise ValidationError("url", url, "URL格式无效")
+
+        if "@" in parts.netloc or not self._is_valid_host(parts.hostname):
             raise ValidationError("url", url, "URL格式无效")
 
         return url
 
+    def _is_valid_domain(self, host: str) -> bool:
+        """检查域名：至少一级标签加顶级域名，允许末尾的点"""
+        labels = (host[:-1] if host.endswith(".") else host).split(".")
+        if len(labels) < 2 or not _TLD_RE.fullmatch(labels[-1]):
+            return False
+
+        match_label = _HOST_LABEL_RE.fullmatch
+        return all(match_label(label) for label in labels[:-1])
+
+    def _is_valid_host(self, host: Optional[str]) -> bool:
+        """检查URL主机名：域名、localhost 或 IP 地址"""
+        if not host:
+            return False
+
+        if host == "localhost" or self._is_valid_domain(host):
+            return True
+
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return True
+
     def validate_search_keyword(self, keyword: Any) -> str:
         """验证搜索关键词"""
-        if not isinstance(keyword, str):
-            raise ValidationError("search_keyword", keyword, "必须是字符串类型")
-
-        keyword = keyword.strip()
-        if not keyword:
-            raise ValidationError("search_keyword", keyword, "搜索关键词不能为空")
+        keyword = self._require_nonempty_str("search_keyword", keyword, "搜索关键词不能为空")
 
         if len(keyword) > 50:
             raise ValidationError("search_keyword", keyword, "搜索关键词长度不能超过50个字符")
 
         # 检查是否包含特殊字符（允许中文、英文、数字、空格）
-        if not re.match(r"^[\u4e00-\u9fa5a-zA-Z0-9\s]+$", keyword):
+        if not _is_keyword_text(keyword):
             raise ValidationError("search_keyword", keyword, "只能包含中文、英文、数字和空格")
 
         return keyword
 
     def validate_count(self, count: Any, min_val: int = 1, max_val: int = 10) -> int:
         """验证数量参数"""
-        # 类型转换
-        if isinstance(count, str):
+        # 整数直接进入范围检查；type 判断同时排除 bool（int 的子类）
+        if type(count) is not int:
+            if not isinstance(count, str):
+                raise ValidationError("count", count, "必须是整数类型")
             try:
                 count = int(count)
             except ValueError:
                 raise ValidationError("count", count, "必须是有效的整数")
 
-        if not isinstance(count, int):
-            raise ValidationError("count", count, "必须是整数类型")
-
         if count < min_val:
             raise ValidationError("count", count, f"不能小于{min_val}")
 
@@ -125,13 +220,11 @@ class DataValidator:
 
     def validate_random_count(self, count: Any) -> int:
         """验证随机推荐数量"""
-        return self.validate_count(
-            count, self.config.min_random_count, self.config.max_random_count
-        )
+        return self.validate_count(count, *self._random_bounds)
 
     def validate_search_results_limit(self, limit: Any) -> int:
         """验证搜索结果限制数量"""
-        return self.validate_count(limit, 1, self.config.max_search_results)
+        return self.validate_count(limit, *self._search_limit_bounds)
 
     def validate_recipe_data(self, recipe_data: Dict[str, Any]) -> Dict[str, str]:
         """验证完整的食谱数据"""
@@ -148,17 +241,14 @@ class DataValidator:
         validated_data["name"] = self.validate_recipe_name(recipe_data["name"])
 
         # 验证分类（这里假设英文分类已验证）
-        if not isinstance(recipe_data["category"], str) or not recipe_data["category"].strip():
-            raise ValidationError("category", recipe_data["category"], "英文分类无效")
-        validated_data["category"] = recipe_data["category"].strip()
+        validated_data["category"] = self._require_nonempty_str(
+            "category", recipe_data["category"], "英文分类无效", "英文分类无效"
+        )
 
         # 验证中文分类
-        if (
-            not isinstance(recipe_data["category_zh"], str)
-            or not recipe_data["category_zh"].strip()
-        ):
-            raise ValidationError("category_zh", recipe_data["category_zh"], "中文分类无效")
-        validated_data["category_zh"] = recipe_data["category_zh"].strip()
+        validated_data["category_zh"] = self._require_nonempty_str(
+            "category_zh", recipe_data["category_zh"], "中文分类无效", "中文分类无效"
+        )
 
         # 验证URL
         validated_data["url"] = self.validate_url(recipe_data["url"])
@@ -169,54 +259,25 @@ class DataValidator:
         """验证命令参数"""
         validated_params = {}
 
-        if command == "search":
-            if "keyword" in params:
-                validated_params["keyword"] = self.validate_search_keyword(params["keyword"])
-            if "limit" in params:
-                validated_params["limit"] = self.validate_search_results_limit(params["limit"])
-
-        elif command == "random":
-            if "count" in params:
-                validated_params["count"] = self.validate_random_count(params["count"])
-            if "category" in params and params["category"]:
-                # 分类验证需要在具体使用时进行，这里只做基础验证
-                if not isinstance(params["category"], str):
-                    raise ValidationError("category", params["category"], "必须是字符串类型")
-                validated_params["category"] = params["category"].strip()
-
-        elif command == "recipe_url":
-            if "dish_name" in params:
-                validated_params["dish_name"] = self.validate_recipe_name(params["dish_name"])
+        for key, method_name in _COMMAND_SCHEMA.get(command, ()):
+            if key in params:
+                validated_params[key] = getattr(self, method_name)(params[key])
+
+        if command == "random" and params.get("category"):
+            # 分类验证需要在具体使用时进行，这里只做基础验证
+            if not isinstance(params["category"], str):
+                raise ValidationError("category", params["category"], "必须是字符串类型")
+            validated_params["category"] = params["category"].strip()
 
         return validated_params
 
     def validate_config(self, config: Dict[str, Any]) -> None:
         """验证配置参数"""
-        # 验证超时设置
-        if "request_timeout" in config:
-            timeout = config["request_timeout"]
-            if not isinstance(timeout, (int, float)) or timeout <= 0:
-                raise ValidationError("request_timeout", timeout, "必须是正数")
-
-        # 验证重试次数
-        if "max_retries" in config:
-            retries = config["max_retries"]
-            if not isinstance(retries, int) or retries < 0:
-                raise ValidationError("max_retries", retries, "必须是非负整数")
-
-        # 验证缓存TTL
-        if "cache_ttl" in config:
-            ttl = config["cache_ttl"]
-            if not isinstance(ttl, int) or ttl <= 0:
-                raise ValidationError("cache_ttl", ttl, "必须是正整数")
-
-        # 验证限制参数
-        limit_fields = ["max_search_results", "max_random_results", "max_category_display"]
-        for field in limit_fields:
+        for field, expected_type, is_valid, reason in _CONFIG_RULES:
             if field in config:
                 value = config[field]
-                if not isinstance(value, int) or value <= 0:
-                    raise ValidationError(field, value, "必须是正整数")
+                if not isinstance(value, expected_type) or not is_valid(value):
+                    raise ValidationError(field, value, reason)
 
     def sanitize_input(self, text: Any) -> str:
         """清理用户输入"""
@@ -226,14 +287,12 @@ class DataValidator:
         # 移除首尾空白
         text = text.strip()
 
-        # 移除控制字符
-        text = re.sub(r"[\x00-\x1f\x7f-\x9f]", "", text)
-
-        # 限制长度
-        if len(text) > 200:
-            text = text[:200]
+        # 移除控制字符；可打印文本必然不含控制字符，跳过正则替换
+        if not text.isprintable():
+            text = _CONTROL_CHARS_RE.sub("", text)
 
-        return text
+        # 限制长度，短输入原样返回
+        return text if len(text) <= 200 else text[:200]
 
     def is_safe_filename(self, filename: str) -> bool:
         """检查文件名是否安全"""
@@ -241,37 +300,11 @@ class DataValidator:
             return False
 
         # 检查危险字符
-        dangerous_chars = r'[<>:"/\\|?*\x00-\x1f]'
-        if re.search(dangerous_chars, filename):
+        if filename.translate(_DANGEROUS_FILENAME_TABLE) != filename:
             return False
 
         # 检查保留名称
-        reserved_names = [
-            "CON",
-            "PRN",
-            "AUX",
-            "NUL",
-            "COM1",
-            "COM2",
-            "COM3",
-            "COM4",
-            "COM5",
-            "COM6",
-            "COM7",
-            "COM8",
-            "COM9",
-            "LPT1",
-            "LPT2",
-            "LPT3",
-            "LPT4",
-            "LPT5",
-            "LPT6",
-            "LPT7",
-            "LPT8",
-            "LPT9",
-        ]
-
-        if filename.upper() in reserved_names:
+        if filename.upper() in _RESERVED_FILENAMES:
             return False
 
         return True